@@ -3,12 +3,37 @@
 
 from __future__ import annotations
 
-import importlib
+import importlib.util
 import os
 import subprocess
 import sys
 from pathlib import Path
 
+# Stdlib packages the CLI never uses; excluding them shrinks the archive that a
+# onefile build unpacks on every launch
+_EXCLUDED_MODULES = ("tkinter", "test", "pydoc_data", "lib2to3", "xmlrpc", "unittest")
+
+
+def _pick_pyinstaller() -> list[str] | None:
+    """Return the first PyInstaller command prefix that answers ``--version``.
+
+    Tries ``python -m PyInstaller`` for this interpreter first, then the
+    ``pyinstaller`` script from PATH. The probe is cheap compared to a build,
+    so a broken invocation no longer costs a full failed build attempt.
+    """
+    candidates = [[sys.executable, "-m", "PyInstaller"], ["pyinstaller"]]
+    for candidate in candidates:
+        try:
+            probe = subprocess.run(
+                [*candidate, "--version"], capture_output=True, text=True, check=False
+            )
+        except OSError:
+            # The PATH script may not exist at all
+            continue
+        if probe.returncode == 0:
+            return candidate
+    return None
+
 
 def build_exe() -> None:
     """Build the executable using PyInstaller."""
@@ -20,57 +45,68 @@ def build_exe() -> None:
     print("Python version:", sys.version)
     print("PATH:", os.environ.get("PATH"))
 
-    # Ensure pyinstaller is installed for this python interpreter
-    try:
-        importlib.import_module("PyInstaller")
+    # Ensure pyinstaller is installed for this python interpreter. find_spec only
+    # locates the package, avoiding the cost of importing all of PyInstaller.
+    if importlib.util.find_spec("PyInstaller") is not None:
         print("PyInstaller already importable")
-    except Exception:
+    else:
         print("PyInstaller not available, installing...")
-        subprocess.run([sys.executable, "-m", "pip", "install", "pyinstaller"], check=True)
+        # pip's default wheel cache is left enabled so repeat installs in the same
+        # environment or CI runner are served locally instead of from PyPI
+        subprocess.run(
+            [
+                sys.executable,
+                "-m",
+                "pip",
+                "install",
+                "--disable-pip-version-check",
+                "--no-input",
+                "pyinstaller",
+            ],
+            check=True,
+        )
+
+    # Pick a working PyInstaller invocation up front so the build runs only once
+    pyinstaller = _pick_pyinstaller()
+    if pyinstaller is None:
+        print("Build failed: neither 'python -m PyInstaller' nor 'pyinstaller' is runnable")
+        sys.exit(1)
+
+    # A onedir build starts faster since nothing is unpacked at launch; set
+    # DIFF_UTILITY_ONEDIR=1 for local use. Releases stay a single executable.
+    onedir = os.environ.get("DIFF_UTILITY_ONEDIR") == "1"
 
     # Run PyInstaller
     cmd = [
-        sys.executable,
-        "-m",
-        "PyInstaller",
-        "--onefile",  # Single executable file
+        *pyinstaller,
+        "--onedir" if onedir else "--onefile",
         "--name",
         "diff-utility",
         "--console",  # Console app (no GUI)
-        "src/diff_utility/cli.py",
     ]
+    if importlib.util.find_spec("cdifflib") is not None:
+        # Imported by name at runtime, which PyInstaller cannot see
+        cmd += ["--hidden-import", "cdifflib"]
+    for module in _EXCLUDED_MODULES:
+        cmd += ["--exclude-module", module]
+    if sys.platform != "win32":
+        # Strip symbols from the bundled binaries; not supported on Windows
+        cmd.append("--strip")
+    cmd.append("src/diff_utility/cli.py")
 
-    print("Building executable with sys.executable -m PyInstaller...")
+    print(f"Building executable with {' '.join(pyinstaller)}...")
     result = subprocess.run(cmd, cwd=project_root, capture_output=True, text=True, check=False)
 
-    # If `python -m PyInstaller` fails, try calling the `pyinstaller` script from PATH
-    if result.returncode != 0:
-        print("First build attempt failed, trying 'pyinstaller' script from PATH...")
-        fallback_cmd = [
-            "pyinstaller",
-            "--onefile",
-            "--name",
-            "diff-utility",
-            "--console",
-            "src/diff_utility/cli.py",
-        ]
-        fallback = subprocess.run(
-            fallback_cmd, cwd=project_root, capture_output=True, text=True, check=False
-        )
-        if fallback.returncode == 0:
-            print("Build successful via fallback 'pyinstaller' call")
-            print("Executable created at: dist/diff-utility.exe")
-            return
-        print("Fallback build also failed:")
-        print(fallback.stderr)
-
     if result.returncode != 0:
         print("Build failed:")
         print(result.stderr)
         sys.exit(1)
 
     print("Build successful!")
-    print("Executable created at: dist/diff-utility.exe")
+    if onedir:
+        print("Executable created at: dist/diff-utility/diff-utility.exe")
+    else:
+        print("Executable created at: dist/diff-utility.exe")
 
 
 if __name__ == "__main__":
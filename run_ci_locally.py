@@ -5,16 +5,22 @@ from __future__ import annotations
 
 import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 
-def run_command(cmd: list[str], description: str) -> bool:
-    """Run a command and return True if successful."""
-    print(f"\n--- {description} ---")
+def run_command(cmd: list[str], description: str) -> tuple[str, bool, str, str]:
+    """Run a command and return its description, success flag, stdout and stderr."""
     result = subprocess.run(cmd, capture_output=True, text=True, check=False)
-    if result.returncode != 0:
+    return description, result.returncode == 0, result.stdout, result.stderr
+
+
+def report(description: str, ok: bool, stdout: str, stderr: str) -> bool:
+    """Print the buffered result of a check and return its success flag."""
+    print(f"\n--- {description} ---")
+    if not ok:
         print("FAILED:")
-        print(result.stdout)
-        print(result.stderr)
+        print(stdout)
+        print(stderr)
         return False
     print("PASSED")
     return True
@@ -24,15 +30,24 @@ def main() -> None:
     """Run all CI checks."""
     print("Running local CI checks...")
 
-    checks = [
+    # Read-only checks over the tree; safe to run concurrently
+    parallel_checks = [
         (["python", "-m", "black", "--check", "."], "Format check (black)"),
         (["python", "-m", "ruff", "check", "."], "Lint (ruff)"),
         (["python", "-m", "mypy", "--strict", "."], "Type check (mypy)"),
+    ]
+    # pytest writes coverage.json, which the branch coverage check then reads
+    serial_checks = [
         (
             [
                 "python",
                 "-m",
                 "pytest",
+                "-n",
+                "auto",
+                "--dist=loadgroup",
+                "-m",
+                "not benchmark",
                 "--cov=src",
                 "--cov-branch",
                 "--cov-report=term-missing:skip-covered",
@@ -47,11 +62,21 @@ def main() -> None:
             ["python", "scripts/check_branch_coverage.py", "--threshold", "75"],
             "Enforce branch coverage",
         ),
+        (
+            ["python", "-m", "pytest", "-m", "benchmark", "--no-cov", "--benchmark-only"],
+            "Benchmarks",
+        ),
     ]
 
     all_passed = True
-    for cmd, desc in checks:
-        if not run_command(cmd, desc):
+    with ThreadPoolExecutor(max_workers=len(parallel_checks)) as executor:
+        futures = [executor.submit(run_command, cmd, desc) for cmd, desc in parallel_checks]
+        for future in as_completed(futures):
+            if not report(*future.result()):
+                all_passed = False
+
+    for cmd, desc in serial_checks:
+        if not report(*run_command(cmd, desc)):
             all_passed = False
 
     if all_passed:
@@ -9,29 +9,52 @@ Usage:
 """
 
 import argparse
+import importlib
 import json
 import sys
+from collections.abc import Callable
 from pathlib import Path
+from typing import Any
 
 
-def check_branch_coverage(coverage_file: Path, threshold: float) -> int:
+def _select_json_loads() -> Callable[[bytes], Any]:
+    """Return orjson.loads when available, falling back to json.loads.
+
+    orjson parses several times faster than the stdlib. Its JSONDecodeError
+    subclasses json.JSONDecodeError, so error handling is the same either way.
+    """
+    try:
+        orjson = importlib.import_module("orjson")
+    except ImportError:  # pragma: no cover - orjson is an optional dev dependency
+        return json.loads
+    loads: Callable[[bytes], Any] = orjson.loads
+    return loads
+
+
+_json_loads = _select_json_loads()
+
+
+def check_branch_coverage(coverage_file: Path | bytes, threshold: float) -> int:
     """
     Check branch coverage against threshold.
 
     Args:
-        coverage_file: Path to coverage JSON report.
+        coverage_file: Path to coverage JSON report, or the report's raw bytes.
         threshold: Minimum required branch coverage percentage.
 
     Returns:
         Exit code: 0 if passing, 1 if failing.
     """
-    if not coverage_file.exists():
+    if isinstance(coverage_file, bytes):
+        raw = coverage_file
+    elif not coverage_file.exists():
         print(f"ERROR: Coverage file not found: {coverage_file}", file=sys.stderr)
         return 1
+    else:
+        raw = coverage_file.read_bytes()
 
     try:
-        with coverage_file.open() as f:
-            data = json.load(f)
+        data = _json_loads(raw)
     except json.JSONDecodeError as e:
         print(f"ERROR: Invalid JSON in coverage file: {e}", file=sys.stderr)
         return 1
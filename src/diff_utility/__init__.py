@@ -7,14 +7,21 @@ detecting new or missing whitespace boundaries.
 
 from __future__ import annotations
 
-from diff_utility.diff import (
-    annotate_changes,
-    diff_files,
-    diff_lines,
-    lines_equal_norm,
-    normalize_line,
-    read_lines,
-)
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from diff_utility.diff import (
+        annotate_changes,
+        diff_files,
+        diff_files_stream,
+        diff_lines,
+        iter_diff_lines,
+        lines_equal_norm,
+        normalize_line,
+        read_lines,
+        write_diff_lines,
+    )
 
 __version__ = "1.3.0"
 
@@ -22,8 +29,30 @@ __all__ = [
     "__version__",
     "annotate_changes",
     "diff_files",
+    "diff_files_stream",
     "diff_lines",
+    "iter_diff_lines",
     "lines_equal_norm",
     "normalize_line",
     "read_lines",
+    "write_diff_lines",
 ]
+
+
+def __getattr__(name: str) -> object:
+    """Import the diff engine on first access to one of its re-exported names.
+
+    Keeps ``import diff_utility`` (and with it the CLI's help and argument-error
+    paths) from loading difflib and the rest of the engine up front.
+    """
+    if name in __all__ and name != "__version__":
+        value = getattr(importlib.import_module("diff_utility.diff"), name)
+        globals()[name] = value
+        return value
+    msg = f"module {__name__!r} has no attribute {name!r}"
+    raise AttributeError(msg)
+
+
+def __dir__() -> list[str]:
+    """List the module's attributes, including the not yet imported re-exports."""
+    return sorted({*globals(), *__all__})
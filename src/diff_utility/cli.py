@@ -2,87 +2,131 @@
 
 from __future__ import annotations
 
-import argparse
 import sys
 from pathlib import Path
 
 from diff_utility import __version__
-from diff_utility.diff import diff_files
 
+_PROG = "diff-utility"
 
-def main() -> int:  # noqa: PLR0911
-    """Main entry point for the diff-utility CLI.
+_USAGE = f"""\
+usage: {_PROG} [-h] [-v] [-file1 FILE1] [-file2 FILE2] [-output OUTPUT]
+                    [file1] [file2] [output]"""
 
-    Returns:
-        Exit code: 0 on success, 1 on I/O error, 2 on argument error.
-    """
-    # Convert special help cases to standard --help
-    argv = sys.argv.copy()
-    if len(argv) > 1 and argv[1] in ("/?", "--?"):
-        argv[1] = "--help"
-
-    parser = argparse.ArgumentParser(
-        prog="diff-utility",
-        description=f"Compare two text files with custom whitespace handling (v{__version__})",
-    )
+_HELP = f"""\
+{_USAGE}
 
-    # Version argument
-    parser.add_argument(
-        "-v",
-        "--version",
-        action="version",
-        version=f"%(prog)s {__version__}",
-    )
+Compare two text files with custom whitespace handling (v{__version__})
 
-    # Positional arguments (optional when named arguments are used)
-    parser.add_argument(
-        "file1",
-        type=str,
-        nargs="?",
-        help="Path to the first file (positional)",
-    )
-    parser.add_argument(
-        "file2",
-        type=str,
-        nargs="?",
-        help="Path to the second file (positional)",
-    )
-    parser.add_argument(
-        "output",
-        type=str,
-        nargs="?",
-        help="Path to the output file (positional, optional)",
-    )
+positional arguments:
+  file1                 Path to the first file (positional)
+  file2                 Path to the second file (positional)
+  output                Path to the output file (positional, optional)
 
-    # Named arguments
-    parser.add_argument(
-        "-file1",
-        "-1",
-        dest="named_file1",
-        type=str,
-        help="Path to the first file (named, overrides positional)",
-    )
-    parser.add_argument(
-        "-file2",
-        "-2",
-        dest="named_file2",
-        type=str,
-        help="Path to the second file (named, overrides positional)",
-    )
-    parser.add_argument(
-        "-output",
-        "-o",
-        dest="named_output",
-        type=str,
-        help="Path to the output file (named, overrides positional)",
+options:
+  -h, --help, /?, --?   show this help message and exit
+  -v, --version         show program's version number and exit
+  -file1 FILE1, -1 FILE1
+                        Path to the first file (named, overrides positional)
+  -file2 FILE2, -2 FILE2
+                        Path to the second file (named, overrides positional)
+  -output OUTPUT, -o OUTPUT
+                        Path to the output file (named, overrides positional)"""
+
+_HELP_FLAGS = frozenset({"-h", "--help", "/?", "--?"})
+_VERSION_FLAGS = frozenset({"-v", "--version"})
+
+# Named options taking a value, mapped to the index of the value they set
+_NAMED_OPTIONS = {
+    "-file1": 0,
+    "-1": 0,
+    "-file2": 1,
+    "-2": 1,
+    "-output": 2,
+    "-o": 2,
+}
+_OPTION_LABELS = ("-file1/-1", "-file2/-2", "-output/-o")
+
+
+def _parse_args(argv: list[str]) -> tuple[str | None, str | None, str | None]:
+    """Parse command-line arguments into the first file, second file and output.
+
+    Named options override positional arguments regardless of order. Help and
+    version flags print their text and exit with status 0.
+
+    Args:
+        argv: Arguments excluding the program name.
+
+    Returns:
+        Tuple of (file1, file2, output); each is None when not given.
+
+    Raises:
+        ValueError: If an option is unknown, lacks its value, or there are more
+            than three positional arguments.
+    """
+    positional: list[str] = []
+    named: list[str | None] = [None, None, None]
+    unrecognized: list[str] = []
+
+    index = 0
+    options_done = False
+    while index < len(argv):
+        arg = argv[index]
+        index += 1
+
+        if options_done or arg == "-" or (not arg.startswith("-") and arg != "/?"):
+            positional.append(arg)
+            continue
+        if arg == "--":
+            options_done = True
+            continue
+        if arg in _HELP_FLAGS:
+            print(_HELP)
+            sys.exit(0)
+        if arg in _VERSION_FLAGS:
+            print(f"{_PROG} {__version__}")
+            sys.exit(0)
+
+        # Accept "-option value", "-option=value" and "-1value"-style short forms
+        name, has_value, value = arg.partition("=")
+        if name not in _NAMED_OPTIONS and arg[:2] in _NAMED_OPTIONS:
+            name, has_value, value = arg[:2], "=", arg[2:]
+        if name not in _NAMED_OPTIONS:
+            unrecognized.append(arg)
+            continue
+        if not has_value:
+            if index == len(argv) or (argv[index].startswith("-") and argv[index] != "-"):
+                msg = f"argument {_OPTION_LABELS[_NAMED_OPTIONS[name]]}: expected one argument"
+                raise ValueError(msg)
+            value = argv[index]
+            index += 1
+        named[_NAMED_OPTIONS[name]] = value
+
+    unrecognized.extend(positional[3:])
+    if unrecognized:
+        msg = f"unrecognized arguments: {' '.join(unrecognized)}"
+        raise ValueError(msg)
+
+    padded: list[str | None] = [*positional, None, None, None]
+    file1, file2, output = (
+        given if given is not None else default
+        for given, default in zip(named, padded, strict=False)
     )
+    return file1, file2, output
 
-    args = parser.parse_args(argv[1:])
 
-    # Named arguments override positional ones
-    final_file1 = args.named_file1 if args.named_file1 is not None else args.file1
-    final_file2 = args.named_file2 if args.named_file2 is not None else args.file2
-    final_output = args.named_output if args.named_output is not None else args.output
+def main() -> int:  # noqa: PLR0911
+    """Main entry point for the diff-utility CLI.
+
+    Returns:
+        Exit code: 0 on success, 1 on I/O error, 2 on argument error.
+    """
+    try:
+        final_file1, final_file2, final_output = _parse_args(sys.argv[1:])
+    except ValueError as e:
+        print(_USAGE, file=sys.stderr)
+        print(f"{_PROG}: error: {e}", file=sys.stderr)
+        return 2
 
     # Validate required arguments
     if final_file1 is None:
@@ -104,14 +148,25 @@ def main() -> int:  # noqa: PLR0911
             print(f"Error: File not found: {path2}", file=sys.stderr)
             return 1
 
-        result = diff_files(path1, path2)
+        # Imported here so that help, version and argument errors never load the
+        # diff engine
+        from diff_utility.diff import read_lines, write_diff_lines  # noqa: PLC0415
+
+        # Read both inputs before opening the output: opening it truncates the
+        # file, which may be one of the inputs, and a failed read must leave an
+        # existing output file untouched
+        lines1 = read_lines(path1)
+        lines2 = read_lines(path2)
 
-        # Write to output file if specified, otherwise print to stdout
+        # Stream to the output file if specified, otherwise to stdout
         if final_output:
             output_path = Path(final_output)
-            output_path.write_text(result, encoding="utf-8")
+            with output_path.open("w", encoding="utf-8") as out:
+                write_diff_lines(lines1, lines2, out)
         else:
-            print(result)
+            write_diff_lines(lines1, lines2, sys.stdout)
+            # Terminate the output with a newline, as print() did
+            sys.stdout.write("\n")
 
         return 0
 
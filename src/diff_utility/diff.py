@@ -6,19 +6,62 @@ comparing lines, and annotating differences with ++/-- markers.
 
 from __future__ import annotations
 
+import importlib
+import os
 import re
+from collections.abc import Iterator, Sequence
 from difflib import SequenceMatcher
 from pathlib import Path
+from typing import IO, Any
 
+_TOKEN_RE = re.compile(r"\s+|\S+")
 
-def read_lines(path: Path) -> list[str]:
+
+def _select_sequence_matcher() -> type[SequenceMatcher[Any]]:
+    """Return cdifflib's CSequenceMatcher when available, else difflib's SequenceMatcher.
+
+    CSequenceMatcher is a drop-in subclass that runs find_longest_match, the
+    matcher's hot loop, in C. It produces the same opcodes, so output does not
+    depend on whether the optional "fast" extra is installed.
+    """
+    try:
+        cdifflib = importlib.import_module("cdifflib")
+    except ImportError:  # pragma: no cover - cdifflib is an optional dependency
+        return SequenceMatcher
+    matcher_class: type[SequenceMatcher[Any]] = cdifflib.CSequenceMatcher
+    return matcher_class
+
+
+_SequenceMatcher = _select_sequence_matcher()
+
+
+def _split_lines(text: str) -> list[str]:
+    """Split decoded file content into lines without their line terminators.
+
+    "\\r\\n" and "\\r" are translated to "\\n" first, as a text-mode read would.
+    Unlike str.splitlines, only those are treated as line breaks, matching line
+    iteration over a text-mode file (form feeds and other separators are kept
+    as line content).
+    """
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    lines = text.split("\n")
+    if lines[-1] == "":
+        # Drop the empty string produced by a trailing newline (or empty text)
+        lines.pop()
+    return lines
+
+
+def read_lines(source: Path | IO[str]) -> list[str]:
     """
     Attempts to read the file with UTF-8 encoding first. If that fails due to
     encoding errors, falls back to Windows-1252 encoding commonly used on Windows,
     then latin-1. If all encodings fail, reads with UTF-8 and skips invalid characters.
 
+    A text stream is already decoded, so it is read as-is without the fallback.
+
     Args:
-        path: Path to the file to read.
+        source: Path to the file to read, or a readable text stream.
 
     Returns:
         List of lines with trailing newlines removed.
@@ -28,19 +71,24 @@ def read_lines(path: Path) -> list[str]:
         PermissionError: If the file cannot be read.
         OSError: For other I/O errors.
     """
+    if not isinstance(source, os.PathLike):
+        return _split_lines(source.read())
+
     encodings = ["utf-8", "cp1252", "latin-1"]
 
+    # Read the raw bytes once; each fallback encoding decodes from memory. Other
+    # PathLike objects such as os.DirEntry have no read_bytes, hence the Path()
+    data = Path(source).read_bytes()
+
     for encoding in encodings:
         try:
-            with path.open("r", encoding=encoding) as f:
-                return [line.rstrip("\n") for line in f]
+            return _split_lines(data.decode(encoding))
         except UnicodeDecodeError:
             continue
 
     # If all encodings fail, fall back to utf-8 with errors='ignore'
     # This skips invalid characters rather than crashing
-    with path.open("r", encoding="utf-8", errors="ignore") as f:
-        return [line.rstrip("\n") for line in f]
+    return _split_lines(data.decode("utf-8", errors="ignore"))
 
 
 def normalize_line(line: str) -> str:
@@ -62,9 +110,21 @@ def normalize_line(line: str) -> str:
         >>> normalize_line("Hello\\tWorld")
         'Hello World'
         >>> normalize_line("  Hello World  ")
-        '  Hello World  '
+        ' Hello World '
     """
-    return re.sub(r"\s+", " ", line)
+    # Equivalent to re.sub(r"\s+", " ", line): str.split() and the regex \s class
+    # use the same Unicode whitespace definition, but splitting runs in a single C
+    # loop. split() drops the leading/trailing runs, so they are re-added here.
+    words = line.split()
+    if not words:
+        # Empty or whitespace-only line
+        return " " if line else ""
+    normalized = " ".join(words)
+    if line[0].isspace():
+        normalized = " " + normalized
+    if line[-1].isspace():
+        normalized += " "
+    return normalized
 
 
 def lines_equal_norm(a: str, b: str) -> bool:
@@ -77,13 +137,8 @@ def lines_equal_norm(a: str, b: str) -> bool:
     Returns:
         True if normalized lines are equal, False otherwise.
     """
-    return normalize_line(a) == normalize_line(b)
-
-
-def _format_file_line(label: str, content: str) -> str:
-    """Return a diff output line prefixed with the file label."""
-
-    return f"{label}: {content}" if content else f"{label}: "
+    # Identical lines are equal whatever normalization does; skip it for them
+    return a == b or normalize_line(a) == normalize_line(b)
 
 
 def _tokenize(line: str) -> list[str]:
@@ -101,7 +156,7 @@ def _tokenize(line: str) -> list[str]:
         >>> _tokenize("Hello  World")
         ['Hello', '  ', 'World']
     """
-    return re.findall(r"\s+|\S+", line)
+    return _TOKEN_RE.findall(line)
 
 
 def annotate_changes(line1: str, line2: str) -> str:
@@ -127,33 +182,128 @@ def annotate_changes(line1: str, line2: str) -> str:
     tokens1 = _tokenize(line1)
     tokens2 = _tokenize(line2)
 
-    matcher = SequenceMatcher(None, tokens1, tokens2)
-    result: list[str] = []
+    # Identical leading and trailing tokens are emitted as-is; only the differing
+    # middle goes through the matcher, whose cost grows with its input length
+    prefix, suffix = _common_affix(tokens1, tokens2)
+    mid1 = tokens1[prefix : len(tokens1) - suffix]
+    mid2 = tokens2[prefix : len(tokens2) - suffix]
+    head = tokens2[:prefix]
+    tail = tokens2[len(tokens2) - suffix :]
+
+    if not mid1 or not mid2:
+        # One side has nothing left (including an empty line), so the middle is a
+        # pure insertion or deletion and the matcher would only confirm that
+        deleted = [f"--{token}--" for token in mid1]
+        inserted = [f"++{token}++" for token in mid2]
+        return "".join([*head, *deleted, *inserted, *tail])
+
+    # Map each distinct token to a small int so the matcher hashes and compares ints;
+    # the original tokens are still used when building the annotated output
+    vocab: dict[str, int] = {}
+    ids1 = [vocab.setdefault(token, len(vocab)) for token in mid1]
+    ids2 = [vocab.setdefault(token, len(vocab)) for token in mid2]
+
+    matcher = _SequenceMatcher(None, ids1, ids2)
+    result = head
 
     for opcode, i1, i2, j1, j2 in matcher.get_opcodes():
         if opcode == "equal":
             # Tokens are the same, emit as-is
-            result.extend(tokens2[j1:j2])
+            result.extend(mid2[j1:j2])
         elif opcode == "insert":
             # Tokens only in file2 (additions)
-            for token in tokens2[j1:j2]:
+            for token in mid2[j1:j2]:
                 result.append(f"++{token}++")
         elif opcode == "delete":
             # Tokens only in file1 (deletions)
-            for token in tokens1[i1:i2]:
+            for token in mid1[i1:i2]:
                 result.append(f"--{token}--")
         elif opcode == "replace":
             # Tokens differ: treat as delete + insert
-            for token in tokens1[i1:i2]:
+            for token in mid1[i1:i2]:
                 result.append(f"--{token}--")
-            for token in tokens2[j1:j2]:
+            for token in mid2[j1:j2]:
                 result.append(f"++{token}++")
 
+    result.extend(tail)
     return "".join(result)
 
 
-def diff_lines(lines1: list[str], lines2: list[str]) -> list[str]:
-    """Generate diff output blocks for changed lines.
+def _common_affix(ids1: Sequence[object], ids2: Sequence[object]) -> tuple[int, int]:
+    """Return the lengths of the common prefix and common suffix of two sequences.
+
+    The suffix is measured on what remains after the prefix, so the two never
+    overlap.
+    """
+    limit = min(len(ids1), len(ids2))
+    prefix = 0
+    while prefix < limit and ids1[prefix] == ids2[prefix]:
+        prefix += 1
+
+    limit -= prefix
+    suffix = 0
+    while suffix < limit and ids1[-1 - suffix] == ids2[-1 - suffix]:
+        suffix += 1
+
+    return prefix, suffix
+
+
+def _trimmed_opcodes(ids1: list[int], ids2: list[int]) -> Iterator[tuple[str, int, int, int, int]]:
+    """Yield line-level opcodes for the region between the common prefix and suffix.
+
+    Identical leading and trailing lines are excluded before SequenceMatcher runs,
+    so for mostly-identical files the matcher only sees the changed region. The
+    yielded indices refer to the full sequences; no opcodes are produced for the
+    trimmed prefix and suffix, which are equal by construction.
+    """
+    prefix, suffix = _common_affix(ids1, ids2)
+    matcher = _SequenceMatcher(
+        None, ids1[prefix : len(ids1) - suffix], ids2[prefix : len(ids2) - suffix], autojunk=False
+    )
+    for opcode, i1, i2, j1, j2 in matcher.get_opcodes():
+        yield opcode, i1 + prefix, i2 + prefix, j1 + prefix, j2 + prefix
+
+
+def _line_ids(lines: list[str], vocab: dict[str, int], seen: dict[str, int]) -> list[int]:
+    """Map lines to the ids of their normalized forms, assigning new ids in vocab.
+
+    Lines common to both files, and repeated lines such as blank lines or closing
+    braces, recur throughout a diff; seen memoizes the id by raw line so each
+    distinct line is normalized only once per diff. The memo lives only as long
+    as the diff, unlike a process-wide cache that large files would keep evicting.
+    """
+    ids = []
+    for line in lines:
+        line_id = seen.get(line)
+        if line_id is None:
+            line_id = seen[line] = vocab.setdefault(normalize_line(line), len(vocab))
+        ids.append(line_id)
+    return ids
+
+
+# Upper bound on the pairs _annotate_pair keeps. Repeated pairs (braces, blank
+# lines, boilerplate) recur within a few blocks, while a diff of mostly distinct
+# pairs would otherwise hold every annotation until it finishes
+_ANNOTATION_MEMO_SIZE = 1024
+
+
+def _annotate_pair(memo: dict[tuple[str, str], str], line1: str, line2: str) -> str:
+    """Return annotate_changes(line1, line2), reusing memo for a repeated pair.
+
+    memo is cleared once it holds _ANNOTATION_MEMO_SIZE pairs, so its size stays
+    bounded however many lines the diff changes.
+    """
+    key = (line1, line2)
+    result = memo.get(key)
+    if result is None:
+        if len(memo) >= _ANNOTATION_MEMO_SIZE:
+            memo.clear()
+        result = memo[key] = annotate_changes(line1, line2)
+    return result
+
+
+def iter_diff_lines(lines1: list[str], lines2: list[str]) -> Iterator[str]:
+    """Generate diff output blocks for changed lines, one output line at a time.
 
     Uses SequenceMatcher to detect line insertions, deletions, and replacements.
     This prevents cascading false positives when lines are inserted or deleted.
@@ -162,8 +312,8 @@ def diff_lines(lines1: list[str], lines2: list[str]) -> list[str]:
         lines1: Lines from file 1.
         lines2: Lines from file 2.
 
-    Returns:
-        List of output lines representing the diff.
+    Yields:
+        Output lines representing the diff.
 
     Format for each changed line:
         ---
@@ -172,83 +322,99 @@ def diff_lines(lines1: list[str], lines2: list[str]) -> list[str]:
 
         [changes]
     """
-    output: list[str] = []
-
-    # Use SequenceMatcher with normalized line comparison
-    matcher = SequenceMatcher(None, lines1, lines2, autojunk=False)
-    matcher.set_seq1([normalize_line(line) for line in lines1])
-    matcher.set_seq2([normalize_line(line) for line in lines2])
-
-    for opcode, i1, i2, j1, j2 in matcher.get_opcodes():
+    # Byte-identical leading and trailing lines are equal however they normalize,
+    # so they are dropped with plain string comparisons before any normalizing
+    prefix, suffix = _common_affix(lines1, lines2)
+    lines1 = lines1[prefix : len(lines1) - suffix]
+    lines2 = lines2[prefix : len(lines2) - suffix]
+
+    # Use SequenceMatcher with normalized line comparison. Each line is mapped to a
+    # small int shared by both files, so the matcher hashes and compares ints
+    # instead of whole line strings
+    vocab: dict[str, int] = {}
+    seen: dict[str, int] = {}
+    ids1 = _line_ids(lines1, vocab, seen)
+    ids2 = _line_ids(lines2, vocab, seen)
+
+    # Files often differ in the same way on many lines (braces, blank lines,
+    # repeated boilerplate); recent distinct pairs are annotated only once
+    annotated: dict[tuple[str, str], str] = {}
+
+    for opcode, i1, i2, j1, j2 in _trimmed_opcodes(ids1, ids2):
         if opcode == "equal":
             # Lines are identical after normalization, skip
             continue
         if opcode == "insert":
-            # Lines only in file2 (insertions)
-            for j in range(j1, j2):
-                line2 = lines2[j]
-                output.append("---")
-                output.append(_format_file_line("File A", ""))
-                output.append(_format_file_line("File B", line2))
-                output.append("")
-                # Mark entire line as insertion
-                output.append(f"++{line2}++")
-                output.append("")
+            # Lines only in file2 (insertions); mark entire line as insertion
+            for line2 in lines2[j1:j2]:
+                yield "---"
+                yield "File A: "
+                yield f"File B: {line2}"
+                yield ""
+                yield f"++{line2}++"
+                yield ""
         elif opcode == "delete":
-            # Lines only in file1 (deletions)
-            for i in range(i1, i2):
-                line1 = lines1[i]
-                output.append("---")
-                output.append(_format_file_line("File A", line1))
-                output.append(_format_file_line("File B", ""))
-                output.append("")
-                # Mark entire line as deletion
-                output.append(f"--{line1}--")
-                output.append("")
+            # Lines only in file1 (deletions); mark entire line as deletion
+            for line1 in lines1[i1:i2]:
+                yield "---"
+                yield f"File A: {line1}"
+                yield "File B: "
+                yield ""
+                yield f"--{line1}--"
+                yield ""
         elif opcode == "replace":
             # Lines differ between files
             # Process each pair and use token-level annotation
-            for i, j in zip(range(i1, i2), range(j1, j2), strict=False):
-                line1 = lines1[i]
-                line2 = lines2[j]
-                output.append("---")
-                output.append(_format_file_line("File A", line1))
-                output.append(_format_file_line("File B", line2))
-                output.append("")
-                output.append(annotate_changes(line1, line2))
-                output.append("")
+            for line1, line2 in zip(lines1[i1:i2], lines2[j1:j2], strict=False):
+                yield "---"
+                yield f"File A: {line1}"
+                yield f"File B: {line2}"
+                yield ""
+                yield _annotate_pair(annotated, line1, line2)
+                yield ""
 
             # Handle unequal replace ranges (different number of lines)
             if (i2 - i1) > (j2 - j1):
                 # More deletions than insertions
-                for i in range(i1 + (j2 - j1), i2):
-                    line1 = lines1[i]
-                    output.append("---")
-                    output.append(_format_file_line("File A", line1))
-                    output.append(_format_file_line("File B", ""))
-                    output.append("")
-                    output.append(f"--{line1}--")
-                    output.append("")
+                for line1 in lines1[i1 + (j2 - j1) : i2]:
+                    yield "---"
+                    yield f"File A: {line1}"
+                    yield "File B: "
+                    yield ""
+                    yield f"--{line1}--"
+                    yield ""
             elif (j2 - j1) > (i2 - i1):
                 # More insertions than deletions
-                for j in range(j1 + (i2 - i1), j2):
-                    line2 = lines2[j]
-                    output.append("---")
-                    output.append(_format_file_line("File A", ""))
-                    output.append(_format_file_line("File B", line2))
-                    output.append("")
-                    output.append(f"++{line2}++")
-                    output.append("")
+                for line2 in lines2[j1 + (i2 - i1) : j2]:
+                    yield "---"
+                    yield "File A: "
+                    yield f"File B: {line2}"
+                    yield ""
+                    yield f"++{line2}++"
+                    yield ""
+
+
+def diff_lines(lines1: list[str], lines2: list[str]) -> list[str]:
+    """Generate diff output blocks for changed lines.
+
+    See iter_diff_lines for the output format.
 
-    return output
+    Args:
+        lines1: Lines from file 1.
+        lines2: Lines from file 2.
+
+    Returns:
+        List of output lines representing the diff.
+    """
+    return list(iter_diff_lines(lines1, lines2))
 
 
-def diff_files(path1: Path, path2: Path) -> str:
+def diff_files(path1: Path | IO[str], path2: Path | IO[str]) -> str:
     """Compare two files and generate diff output.
 
     Args:
-        path1: Path to the first file.
-        path2: Path to the second file.
+        path1: Path to the first file, or a readable text stream.
+        path2: Path to the second file, or a readable text stream.
 
     Returns:
         Formatted diff output as a string.
@@ -258,8 +424,55 @@ def diff_files(path1: Path, path2: Path) -> str:
         PermissionError: If either file cannot be read.
         OSError: For other I/O errors.
     """
+    # Read the inputs in order, so errors come from the first when both fail
     lines1 = read_lines(path1)
     lines2 = read_lines(path2)
 
-    diff_output = diff_lines(lines1, lines2)
-    return "\n".join(diff_output)
+    return "\n".join(iter_diff_lines(lines1, lines2))
+
+
+def diff_files_stream(path1: Path | IO[str], path2: Path | IO[str], out: IO[str]) -> None:
+    """Compare two files and write the diff output to a text stream.
+
+    Produces the same text as diff_files, but writes it line by line as the
+    diff is generated instead of building the whole output string first, so
+    peak memory no longer grows with the size of the output.
+
+    Args:
+        path1: Path to the first file, or a readable text stream.
+        path2: Path to the second file, or a readable text stream.
+        out: Writable text stream receiving the diff output.
+
+    Raises:
+        FileNotFoundError: If either file does not exist.
+        PermissionError: If either file cannot be read.
+        OSError: For other I/O errors, including errors writing to out.
+    """
+    # Read the inputs in order, so errors come from the first when both fail
+    lines1 = read_lines(path1)
+    lines2 = read_lines(path2)
+    write_diff_lines(lines1, lines2, out)
+
+
+def write_diff_lines(lines1: list[str], lines2: list[str], out: IO[str]) -> None:
+    """Write the diff of two line lists to a text stream as it is generated.
+
+    The text matches "\n".join(iter_diff_lines(lines1, lines2)). Callers that
+    write to one of the input files read both inputs first and open the output
+    only afterwards, so a failed read leaves the output untouched.
+
+    Args:
+        lines1: Lines from file 1.
+        lines2: Lines from file 2.
+        out: Writable text stream receiving the diff output.
+
+    Raises:
+        OSError: If writing to out fails.
+    """
+    # Separators go between lines only, matching "\n".join() in diff_files
+    write = out.write
+    separator = ""
+    for line in iter_diff_lines(lines1, lines2):
+        write(separator)
+        write(line)
+        separator = "\n"
@@ -0,0 +1,71 @@
+"""Shared pytest fixtures for the Diff Utility test suite."""
+
+from __future__ import annotations
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from diff_utility.diff import annotate_changes, diff_lines, lines_equal_norm, normalize_line
+
+# RAM-backed filesystem used for tmp_path on Linux
+_SHM_DIR = Path("/dev/shm")
+
+# xdist group that --dist=loadgroup runs on a single worker
+_SERIAL_GROUP = "serial"
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    """Default TMPDIR to tmpfs on Linux so tmp_path lives in RAM.
+
+    tmp_path files then live in the page cache only, with no journaling or
+    writeback. pytest still creates its usual numbered, per-user base directories
+    under it, so concurrent runs stay apart and the last few are kept. A TMPDIR
+    that is already set, and an explicit --basetemp, are left alone, as are
+    Windows, macOS and systems without a writable /dev/shm.
+    """
+    if "TMPDIR" in os.environ or config.option.basetemp is not None:
+        return
+    if not sys.platform.startswith("linux") or not os.access(_SHM_DIR, os.W_OK):
+        return
+    os.environ["TMPDIR"] = str(_SHM_DIR)
+    # tempfile caches the directory it picked; make it look again
+    tempfile.tempdir = None
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_collection_modifyitems(items: list[pytest.Item]) -> None:
+    """Put tests marked serial into one xdist group.
+
+    With --dist=loadgroup they then run on a single worker while the pure
+    string tests spread across the rest. Runs before xdist reads the groups.
+    """
+    for item in items:
+        if item.get_closest_marker("serial") is not None:
+            item.add_marker(pytest.mark.xdist_group(_SERIAL_GROUP))
+
+
+@pytest.fixture(scope="session")
+def large_line_pair() -> tuple[tuple[str, ...], tuple[str, ...]]:
+    """Return a synthetic 1000-line file and a copy with one line inserted mid-way.
+
+    Built once per session; tuples keep tests from mutating the shared lines.
+    """
+    base = tuple(f"Line {i}" for i in range(1000))
+    inserted = (*base[:500], "Inserted Line", *base[500:])
+    return base, inserted
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _warm_up_diff_engine() -> None:
+    """Call each diff function once so one-time setup stays out of individual tests.
+
+    Runs in every session (and every xdist worker), before the first test.
+    """
+    normalize_line("a  b")
+    lines_equal_norm("a", "a ")
+    annotate_changes("a b", "a c")
+    diff_lines(["a"], ["b"])
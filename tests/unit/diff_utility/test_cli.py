@@ -2,66 +2,103 @@
 
 from __future__ import annotations
 
+import io
+import subprocess
 import sys
+from collections.abc import Iterator
+from contextlib import contextmanager, redirect_stdout
 from pathlib import Path
-from unittest.mock import patch
+from typing import IO, Any
 
 import pytest
+from pyfakefs.fake_filesystem import FakeFilesystem
 
 from diff_utility import __version__
 from diff_utility.cli import main
 
+pytestmark = pytest.mark.unit
+
+
+@contextmanager
+def set_argv(*args: str) -> Iterator[None]:
+    """Temporarily replace sys.argv with the given arguments."""
+    saved = sys.argv
+    sys.argv = list(args)
+    try:
+        yield
+    finally:
+        sys.argv = saved
+
+
+@pytest.fixture
+def hello_pair(fs: FakeFilesystem) -> tuple[Path, Path]:
+    """Create the "Hello World" / "Hello Universe" input files used by most tests."""
+    file1 = Path("/file1.txt")
+    file2 = Path("/file2.txt")
+
+    file1.write_text("Hello World\n", encoding="utf-8")
+    file2.write_text("Hello Universe\n", encoding="utf-8")
+
+    return file1, file2
+
 
 class TestCLI:
     """Tests for the CLI main function."""
 
-    @pytest.mark.unit
+    @pytest.mark.parametrize(
+        "argv_template",
+        [
+            ["{0}", "{1}"],
+            ["-file1", "{0}", "-file2", "{1}"],
+            ["-1", "{0}", "-2", "{1}"],
+        ],
+        ids=["positional", "named", "short-named"],
+    )
     def test_successful_diff_output(
-        self, tmp_path: Path, capsys: pytest.CaptureFixture[str]
+        self, argv_template: list[str], hello_pair: tuple[Path, Path]
     ) -> None:
-        """Test successful diff operation with output to stdout."""
-        file1 = tmp_path / "file1.txt"
-        file2 = tmp_path / "file2.txt"
-
-        file1.write_text("Hello World\n", encoding="utf-8")
-        file2.write_text("Hello Universe\n", encoding="utf-8")
+        """Test a successful diff to stdout with positional and named file arguments."""
+        argv = [token.format(*hello_pair) for token in argv_template]
 
-        with patch.object(sys, "argv", ["diff-utility", str(file1), str(file2)]):
+        stdout = io.StringIO()
+        with redirect_stdout(stdout), set_argv("diff-utility", *argv):
             exit_code = main()
 
-        captured = capsys.readouterr()
+        output = stdout.getvalue()
         assert exit_code == 0
-        assert "---" in captured.out
-        assert "Hello World" in captured.out
-        assert "Hello Universe" in captured.out
+        assert "---" in output
+        assert "Hello World" in output
+        assert "Hello Universe" in output
 
-    @pytest.mark.unit
-    def test_identical_files_empty_output(
-        self, tmp_path: Path, capsys: pytest.CaptureFixture[str]
-    ) -> None:
+    def test_identical_files_empty_output(self, fs: FakeFilesystem) -> None:
         """Test that identical files produce empty output."""
-        file1 = tmp_path / "file1.txt"
-        file2 = tmp_path / "file2.txt"
+        file1 = Path("/file1.txt")
+        file2 = Path("/file2.txt")
 
         file1.write_text("Same content\n", encoding="utf-8")
         file2.write_text("Same content\n", encoding="utf-8")
 
-        with patch.object(sys, "argv", ["diff-utility", str(file1), str(file2)]):
+        stdout = io.StringIO()
+        with (
+            redirect_stdout(stdout),
+            set_argv("diff-utility", str(file1), str(file2)),
+        ):
             exit_code = main()
 
-        captured = capsys.readouterr()
+        output = stdout.getvalue()
         assert exit_code == 0
-        assert captured.out == "\n"  # Empty output with trailing newline from print
+        assert output == "\n"  # Empty output with trailing newline
 
-    @pytest.mark.unit
-    def test_first_file_not_found(self, tmp_path: Path, capsys: pytest.CaptureFixture[str]) -> None:
+    def test_first_file_not_found(
+        self, fs: FakeFilesystem, capsys: pytest.CaptureFixture[str]
+    ) -> None:
         """Test that missing first file returns exit code 1."""
-        file1 = tmp_path / "nonexistent1.txt"
-        file2 = tmp_path / "file2.txt"
+        file1 = Path("/nonexistent1.txt")
+        file2 = Path("/file2.txt")
 
         file2.write_text("content\n", encoding="utf-8")
 
-        with patch.object(sys, "argv", ["diff-utility", str(file1), str(file2)]):
+        with set_argv("diff-utility", str(file1), str(file2)):
             exit_code = main()
 
         captured = capsys.readouterr()
@@ -69,17 +106,16 @@ class TestCLI:
         assert "Error: File not found" in captured.err
         assert str(file1) in captured.err
 
-    @pytest.mark.unit
     def test_second_file_not_found(
-        self, tmp_path: Path, capsys: pytest.CaptureFixture[str]
+        self, fs: FakeFilesystem, capsys: pytest.CaptureFixture[str]
     ) -> None:
         """Test that missing second file returns exit code 1."""
-        file1 = tmp_path / "file1.txt"
-        file2 = tmp_path / "nonexistent2.txt"
+        file1 = Path("/file1.txt")
+        file2 = Path("/nonexistent2.txt")
 
         file1.write_text("content\n", encoding="utf-8")
 
-        with patch.object(sys, "argv", ["diff-utility", str(file1), str(file2)]):
+        with set_argv("diff-utility", str(file1), str(file2)):
             exit_code = main()
 
         captured = capsys.readouterr()
@@ -87,7 +123,6 @@ class TestCLI:
         assert "Error: File not found" in captured.err
         assert str(file2) in captured.err
 
-    @pytest.mark.unit
     def test_permission_error_handling(
         self, tmp_path: Path, capsys: pytest.CaptureFixture[str], monkeypatch: pytest.MonkeyPatch
     ) -> None:
@@ -104,54 +139,58 @@ class TestCLI:
 
         monkeypatch.setattr(Path, "open", mock_open_permission_error)
 
-        with patch.object(sys, "argv", ["diff-utility", str(file1), str(file2)]):
+        with set_argv("diff-utility", str(file1), str(file2)):
             exit_code = main()
 
         captured = capsys.readouterr()
         assert exit_code == 1
         assert "Error: PermissionError" in captured.err
 
-    @pytest.mark.unit
-    def test_empty_files_no_output(
-        self, tmp_path: Path, capsys: pytest.CaptureFixture[str]
-    ) -> None:
+    def test_empty_files_no_output(self, fs: FakeFilesystem) -> None:
         """Test that empty files produce no diff output."""
-        file1 = tmp_path / "empty1.txt"
-        file2 = tmp_path / "empty2.txt"
+        file1 = Path("/empty1.txt")
+        file2 = Path("/empty2.txt")
 
         file1.write_text("", encoding="utf-8")
         file2.write_text("", encoding="utf-8")
 
-        with patch.object(sys, "argv", ["diff-utility", str(file1), str(file2)]):
+        stdout = io.StringIO()
+        with (
+            redirect_stdout(stdout),
+            set_argv("diff-utility", str(file1), str(file2)),
+        ):
             exit_code = main()
 
-        captured = capsys.readouterr()
+        output = stdout.getvalue()
         assert exit_code == 0
-        assert captured.out == "\n"  # Empty with trailing newline
+        assert output == "\n"  # Empty with trailing newline
 
-    @pytest.mark.unit
-    def test_multiline_diff(self, tmp_path: Path, capsys: pytest.CaptureFixture[str]) -> None:
+    def test_multiline_diff(self, fs: FakeFilesystem) -> None:
         """Test diff output with multiple changed lines."""
-        file1 = tmp_path / "file1.txt"
-        file2 = tmp_path / "file2.txt"
+        file1 = Path("/file1.txt")
+        file2 = Path("/file2.txt")
 
         file1.write_text("Line 1\nLine 2\nLine 3\n", encoding="utf-8")
         file2.write_text("Line One\nLine 2\nLine Three\n", encoding="utf-8")
 
-        with patch.object(sys, "argv", ["diff-utility", str(file1), str(file2)]):
+        stdout = io.StringIO()
+        with (
+            redirect_stdout(stdout),
+            set_argv("diff-utility", str(file1), str(file2)),
+        ):
             exit_code = main()
 
-        captured = capsys.readouterr()
+        output = stdout.getvalue()
         assert exit_code == 0
         # Should have two diff blocks (line 1 and line 3 changed)
-        assert captured.out.count("---") == 2
+        assert output.count("---") == 2
 
-    @pytest.mark.unit
-    def test_help_with_double_dash(self, capsys: pytest.CaptureFixture[str]) -> None:
-        """Test that --help displays help."""
+    @pytest.mark.parametrize("flag", ["-h", "--help", "/?", "--?"])
+    def test_help_flags(self, flag: str, capsys: pytest.CaptureFixture[str]) -> None:
+        """Test that each help flag displays help and exits with code 0."""
         with (
             pytest.raises(SystemExit) as exc_info,
-            patch.object(sys, "argv", ["diff-utility", "--help"]),
+            set_argv("diff-utility", flag),
         ):
             main()
 
@@ -159,85 +198,20 @@ class TestCLI:
         captured = capsys.readouterr()
         assert "Compare two text files" in captured.out
 
-    @pytest.mark.unit
-    def test_help_with_slash_question(self, capsys: pytest.CaptureFixture[str]) -> None:
-        """Test that /? displays help."""
-        with (
-            pytest.raises(SystemExit) as exc_info,
-            patch.object(sys, "argv", ["diff-utility", "/?"]),
-        ):
-            main()
-
-        assert exc_info.value.code == 0
-        captured = capsys.readouterr()
-        assert "Compare two text files" in captured.out
-
-    @pytest.mark.unit
-    def test_help_with_dash_question(self, capsys: pytest.CaptureFixture[str]) -> None:
-        """Test that --? displays help."""
-        with (
-            pytest.raises(SystemExit) as exc_info,
-            patch.object(sys, "argv", ["diff-utility", "--?"]),
-        ):
-            main()
-
-        assert exc_info.value.code == 0
-        captured = capsys.readouterr()
-        assert "Compare two text files" in captured.out
-
-    @pytest.mark.unit
-    def test_named_file1_argument(self, tmp_path: Path, capsys: pytest.CaptureFixture[str]) -> None:
-        """Test using -file1 named argument."""
-        file1 = tmp_path / "file1.txt"
-        file2 = tmp_path / "file2.txt"
-
-        file1.write_text("Hello World\n", encoding="utf-8")
-        file2.write_text("Hello Universe\n", encoding="utf-8")
-
-        with patch.object(
-            sys, "argv", ["diff-utility", "-file1", str(file1), "-file2", str(file2)]
-        ):
-            exit_code = main()
-
-        captured = capsys.readouterr()
-        assert exit_code == 0
-        assert "---" in captured.out
-
-    @pytest.mark.unit
-    def test_short_named_arguments(
-        self, tmp_path: Path, capsys: pytest.CaptureFixture[str]
-    ) -> None:
-        """Test using -1 and -2 short named arguments."""
-        file1 = tmp_path / "file1.txt"
-        file2 = tmp_path / "file2.txt"
-
-        file1.write_text("Hello World\n", encoding="utf-8")
-        file2.write_text("Hello Universe\n", encoding="utf-8")
-
-        with patch.object(sys, "argv", ["diff-utility", "-1", str(file1), "-2", str(file2)]):
-            exit_code = main()
-
-        captured = capsys.readouterr()
-        assert exit_code == 0
-        assert "---" in captured.out
-
-    @pytest.mark.unit
     def test_named_overrides_positional(
-        self, tmp_path: Path, capsys: pytest.CaptureFixture[str]
+        self, fs: FakeFilesystem, capsys: pytest.CaptureFixture[str]
     ) -> None:
         """Test that named arguments override positional ones."""
-        file1 = tmp_path / "file1.txt"
-        file2 = tmp_path / "file2.txt"
-        file3 = tmp_path / "file3.txt"
+        file1 = Path("/file1.txt")
+        file2 = Path("/file2.txt")
+        file3 = Path("/file3.txt")
 
         file1.write_text("File 1\n", encoding="utf-8")
         file2.write_text("File 2\n", encoding="utf-8")
         file3.write_text("File 3\n", encoding="utf-8")
 
         # Positional says file1 and file2, but -file2 overrides with file3
-        with patch.object(
-            sys, "argv", ["diff-utility", str(file1), str(file2), "-file2", str(file3)]
-        ):
+        with set_argv("diff-utility", str(file1), str(file2), "-file2", str(file3)):
             exit_code = main()
 
         captured = capsys.readouterr()
@@ -246,17 +220,12 @@ class TestCLI:
         assert "File 1" in captured.out
         assert "File 3" in captured.out
 
-    @pytest.mark.unit
-    def test_output_to_file_positional(self, tmp_path: Path) -> None:
+    def test_output_to_file_positional(self, hello_pair: tuple[Path, Path]) -> None:
         """Test writing output to file using positional argument."""
-        file1 = tmp_path / "file1.txt"
-        file2 = tmp_path / "file2.txt"
-        output = tmp_path / "output.txt"
+        file1, file2 = hello_pair
+        output = Path("/output.txt")
 
-        file1.write_text("Hello World\n", encoding="utf-8")
-        file2.write_text("Hello Universe\n", encoding="utf-8")
-
-        with patch.object(sys, "argv", ["diff-utility", str(file1), str(file2), str(output)]):
+        with set_argv("diff-utility", str(file1), str(file2), str(output)):
             exit_code = main()
 
         assert exit_code == 0
@@ -266,17 +235,12 @@ class TestCLI:
         assert "Hello World" in content
         assert "Hello Universe" in content
 
-    @pytest.mark.unit
-    def test_output_to_file_named_short(self, tmp_path: Path) -> None:
+    def test_output_to_file_named_short(self, hello_pair: tuple[Path, Path]) -> None:
         """Test writing output to file using -o named argument."""
-        file1 = tmp_path / "file1.txt"
-        file2 = tmp_path / "file2.txt"
-        output = tmp_path / "output.txt"
+        file1, file2 = hello_pair
+        output = Path("/output.txt")
 
-        file1.write_text("Hello World\n", encoding="utf-8")
-        file2.write_text("Hello Universe\n", encoding="utf-8")
-
-        with patch.object(sys, "argv", ["diff-utility", str(file1), str(file2), "-o", str(output)]):
+        with set_argv("diff-utility", str(file1), str(file2), "-o", str(output)):
             exit_code = main()
 
         assert exit_code == 0
@@ -284,19 +248,12 @@ class TestCLI:
         content = output.read_text(encoding="utf-8")
         assert "---" in content
 
-    @pytest.mark.unit
-    def test_output_to_file_named_long(self, tmp_path: Path) -> None:
+    def test_output_to_file_named_long(self, hello_pair: tuple[Path, Path]) -> None:
         """Test writing output to file using -output named argument."""
-        file1 = tmp_path / "file1.txt"
-        file2 = tmp_path / "file2.txt"
-        output = tmp_path / "output.txt"
-
-        file1.write_text("Hello World\n", encoding="utf-8")
-        file2.write_text("Hello Universe\n", encoding="utf-8")
+        file1, file2 = hello_pair
+        output = Path("/output.txt")
 
-        with patch.object(
-            sys, "argv", ["diff-utility", str(file1), str(file2), "-output", str(output)]
-        ):
+        with set_argv("diff-utility", str(file1), str(file2), "-output", str(output)):
             exit_code = main()
 
         assert exit_code == 0
@@ -304,22 +261,15 @@ class TestCLI:
         content = output.read_text(encoding="utf-8")
         assert "---" in content
 
-    @pytest.mark.unit
-    def test_output_named_overrides_positional(self, tmp_path: Path) -> None:
+    def test_output_named_overrides_positional(self, hello_pair: tuple[Path, Path]) -> None:
         """Test that -output named argument overrides positional output."""
-        file1 = tmp_path / "file1.txt"
-        file2 = tmp_path / "file2.txt"
-        output1 = tmp_path / "output1.txt"
-        output2 = tmp_path / "output2.txt"
-
-        file1.write_text("Hello World\n", encoding="utf-8")
-        file2.write_text("Hello Universe\n", encoding="utf-8")
+        file1, file2 = hello_pair
+        output1 = Path("/output1.txt")
+        output2 = Path("/output2.txt")
 
         # Positional output is output1, but -output overrides with output2
-        with patch.object(
-            sys,
-            "argv",
-            ["diff-utility", str(file1), str(file2), str(output1), "-output", str(output2)],
+        with set_argv(
+            "diff-utility", str(file1), str(file2), str(output1), "-output", str(output2)
         ):
             exit_code = main()
 
@@ -327,30 +277,60 @@ class TestCLI:
         assert output2.exists()
         assert not output1.exists()  # Should not create the positional output file
 
-    @pytest.mark.unit
+    def test_output_may_be_an_input_file(self, hello_pair: tuple[Path, Path]) -> None:
+        """Test that writing the output over an input still diffs the original content."""
+        file1, file2 = hello_pair
+
+        with set_argv("diff-utility", str(file1), str(file2), str(file1)):
+            exit_code = main()
+
+        assert exit_code == 0
+        assert file1.read_text(encoding="utf-8") == (
+            "---\nFile A: Hello World\nFile B: Hello Universe\n\nHello --World--++Universe++\n"
+        )
+
+    def test_unreadable_input_keeps_existing_output(
+        self, fs: FakeFilesystem, capsys: pytest.CaptureFixture[str]
+    ) -> None:
+        """Test that an input read error leaves an existing output file untouched."""
+        directory = Path("/not_a_file")
+        directory.mkdir()
+        file2 = Path("/file2.txt")
+        file2.write_text("Hello Universe\n", encoding="utf-8")
+        output = Path("/output.txt")
+        output.write_text("previous result\n", encoding="utf-8")
+
+        with set_argv("diff-utility", str(directory), str(file2), str(output)):
+            exit_code = main()
+
+        captured = capsys.readouterr()
+        assert exit_code == 1
+        assert "Error:" in captured.err
+        assert output.read_text(encoding="utf-8") == "previous result\n"
+
     def test_missing_file1_error(self, capsys: pytest.CaptureFixture[str]) -> None:
         """Test error when file1 is not provided."""
-        with patch.object(sys, "argv", ["diff-utility"]):
+        with set_argv("diff-utility"):
             exit_code = main()
 
         captured = capsys.readouterr()
         assert exit_code == 2
         assert "Error: First file argument is required" in captured.err
 
-    @pytest.mark.unit
-    def test_missing_file2_error(self, tmp_path: Path, capsys: pytest.CaptureFixture[str]) -> None:
+    def test_missing_file2_error(
+        self, fs: FakeFilesystem, capsys: pytest.CaptureFixture[str]
+    ) -> None:
         """Test error when file2 is not provided."""
-        file1 = tmp_path / "file1.txt"
+        file1 = Path("/file1.txt")
         file1.write_text("content\n", encoding="utf-8")
 
-        with patch.object(sys, "argv", ["diff-utility", str(file1)]):
+        with set_argv("diff-utility", str(file1)):
             exit_code = main()
 
         captured = capsys.readouterr()
         assert exit_code == 2
         assert "Error: Second file argument is required" in captured.err
 
-    @pytest.mark.unit
     def test_output_file_permission_error(
         self, tmp_path: Path, capsys: pytest.CaptureFixture[str], monkeypatch: pytest.MonkeyPatch
     ) -> None:
@@ -362,20 +342,25 @@ class TestCLI:
         file1.write_text("Hello World\n", encoding="utf-8")
         file2.write_text("Hello Universe\n", encoding="utf-8")
 
-        def mock_write_text_permission_error(self: Path, *args: object, **kwargs: object) -> None:
-            msg = "Permission denied"
-            raise PermissionError(msg)
+        real_open = Path.open
 
-        monkeypatch.setattr(Path, "write_text", mock_write_text_permission_error)
+        def mock_open_permission_error(
+            self: Path, mode: str = "r", *args: Any, **kwargs: Any
+        ) -> IO[Any]:
+            if "w" in mode:
+                msg = "Permission denied"
+                raise PermissionError(msg)
+            return real_open(self, mode, *args, **kwargs)
 
-        with patch.object(sys, "argv", ["diff-utility", str(file1), str(file2), "-o", str(output)]):
+        monkeypatch.setattr(Path, "open", mock_open_permission_error)
+
+        with set_argv("diff-utility", str(file1), str(file2), "-o", str(output)):
             exit_code = main()
 
         captured = capsys.readouterr()
         assert exit_code == 1
         assert "Error: PermissionError" in captured.err
 
-    @pytest.mark.unit
     def test_output_file_io_error(
         self, tmp_path: Path, capsys: pytest.CaptureFixture[str], monkeypatch: pytest.MonkeyPatch
     ) -> None:
@@ -387,24 +372,76 @@ class TestCLI:
         file1.write_text("Hello World\n", encoding="utf-8")
         file2.write_text("Hello Universe\n", encoding="utf-8")
 
-        def mock_write_text_io_error(self: Path, *args: object, **kwargs: object) -> None:
-            msg = "Disk full"
-            raise OSError(msg)
+        real_open = Path.open
+
+        def mock_open_io_error(self: Path, mode: str = "r", *args: Any, **kwargs: Any) -> IO[Any]:
+            if "w" in mode:
+                msg = "Disk full"
+                raise OSError(msg)
+            return real_open(self, mode, *args, **kwargs)
 
-        monkeypatch.setattr(Path, "write_text", mock_write_text_io_error)
+        monkeypatch.setattr(Path, "open", mock_open_io_error)
 
-        with patch.object(sys, "argv", ["diff-utility", str(file1), str(file2), "-o", str(output)]):
+        with set_argv("diff-utility", str(file1), str(file2), "-o", str(output)):
             exit_code = main()
 
         captured = capsys.readouterr()
         assert exit_code == 1
         assert "Error: OSError" in captured.err
 
-    @pytest.mark.unit
+    def test_named_argument_equals_form(
+        self, hello_pair: tuple[Path, Path], capsys: pytest.CaptureFixture[str]
+    ) -> None:
+        """Test that -file1=PATH and attached short values like -2PATH are accepted."""
+        file1, file2 = hello_pair
+
+        with set_argv("diff-utility", f"-file1={file1}", f"-2{file2}"):
+            exit_code = main()
+
+        captured = capsys.readouterr()
+        assert exit_code == 0
+        assert "---" in captured.out
+
+    def test_double_dash_ends_options(
+        self, fs: FakeFilesystem, capsys: pytest.CaptureFixture[str]
+    ) -> None:
+        """Test that arguments after -- are treated as positional file names."""
+        file1 = Path("/-file1.txt")
+        file2 = Path("/file2.txt")
+
+        file1.write_text("Hello World\n", encoding="utf-8")
+        file2.write_text("Hello Universe\n", encoding="utf-8")
+
+        with set_argv("diff-utility", str(file2), "--", str(file1)):
+            exit_code = main()
+
+        captured = capsys.readouterr()
+        assert exit_code == 0
+        assert "File B: Hello World" in captured.out
+
+    def test_named_argument_missing_value(self, capsys: pytest.CaptureFixture[str]) -> None:
+        """Test that a named option without a value is an argument error."""
+        with set_argv("diff-utility", "a.txt", "b.txt", "-o"):
+            exit_code = main()
+
+        captured = capsys.readouterr()
+        assert exit_code == 2
+        assert "argument -output/-o: expected one argument" in captured.err
+        assert "usage: diff-utility" in captured.err
+
+    def test_unrecognized_arguments(self, capsys: pytest.CaptureFixture[str]) -> None:
+        """Test that unknown options and extra positionals are argument errors."""
+        with set_argv("diff-utility", "-x", "a", "b", "c", "d"):
+            exit_code = main()
+
+        captured = capsys.readouterr()
+        assert exit_code == 2
+        assert "unrecognized arguments: -x d" in captured.err
+
     def test_version_flag_short(self, capsys: pytest.CaptureFixture[str]) -> None:
         """Test -v flag displays version and exits."""
         with (
-            patch.object(sys, "argv", ["diff-utility", "-v"]),
+            set_argv("diff-utility", "-v"),
             pytest.raises(SystemExit) as exc_info,
         ):
             main()
@@ -414,11 +451,10 @@ class TestCLI:
         assert __version__ in captured.out
         assert "diff-utility" in captured.out
 
-    @pytest.mark.unit
     def test_version_flag_long(self, capsys: pytest.CaptureFixture[str]) -> None:
         """Test --version flag displays version and exits."""
         with (
-            patch.object(sys, "argv", ["diff-utility", "--version"]),
+            set_argv("diff-utility", "--version"),
             pytest.raises(SystemExit) as exc_info,
         ):
             main()
@@ -428,11 +464,10 @@ class TestCLI:
         assert __version__ in captured.out
         assert "diff-utility" in captured.out
 
-    @pytest.mark.unit
     def test_help_includes_version(self, capsys: pytest.CaptureFixture[str]) -> None:
         """Test that help output includes version number."""
         with (
-            patch.object(sys, "argv", ["diff-utility", "--help"]),
+            set_argv("diff-utility", "--help"),
             pytest.raises(SystemExit) as exc_info,
         ):
             main()
@@ -440,3 +475,12 @@ class TestCLI:
         assert exc_info.value.code == 0
         captured = capsys.readouterr()
         assert __version__ in captured.out
+
+    def test_import_does_not_load_diff_engine(self) -> None:
+        """Test that importing the CLI defers loading the diff engine."""
+        code = "import sys, diff_utility.cli; print('diff_utility.diff' in sys.modules)"
+        result = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True
+        )
+
+        assert result.stdout.strip() == "False"
@@ -2,147 +2,234 @@
 
 from __future__ import annotations
 
+import io
+import os
+import re
+import sys
 from pathlib import Path
 
 import pytest
+from pyfakefs.fake_filesystem import FakeFilesystem
+from pytest_benchmark.fixture import BenchmarkFixture
 
+from diff_utility import diff
 from diff_utility.diff import (
     annotate_changes,
     diff_files,
+    diff_files_stream,
     diff_lines,
+    iter_diff_lines,
     lines_equal_norm,
     normalize_line,
     read_lines,
 )
 
+pytestmark = pytest.mark.unit
 
-class TestNormalizeLine:
-    """Tests for the normalize_line function."""
-
-    @pytest.mark.unit
-    def test_multiple_spaces_collapsed_to_single(self) -> None:
-        """Test that multiple spaces are collapsed into a single space."""
-        assert normalize_line("Hello   World") == "Hello World"
-
-    @pytest.mark.unit
-    def test_tab_converted_to_space(self) -> None:
-        """Test that tabs are converted to spaces."""
-        assert normalize_line("Hello\tWorld") == "Hello World"
-
-    @pytest.mark.unit
-    def test_mixed_whitespace_collapsed(self) -> None:
-        """Test that mixed whitespace (spaces and tabs) is collapsed."""
-        assert normalize_line("Hello  \t \t World") == "Hello World"
+# pytest-cov imports coverage even with --no-cov, so check for an active measurement
+_coverage = sys.modules.get("coverage")
+_UNDER_COVERAGE = bool(os.environ.get("COVERAGE_RUN")) or (
+    _coverage is not None and _coverage.Coverage.current() is not None
+)
 
-    @pytest.mark.unit
-    def test_leading_spaces_collapsed(self) -> None:
-        """Test that leading spaces are collapsed."""
-        assert normalize_line("  Hello World") == " Hello World"
+# Legacy-encoded payloads for the read_lines fallback tests, encoded once at import
+_CP1252_BYTES = "Hello\xa0World\nSecond line\n".encode("cp1252")  # non-breaking space 0xa0
+_CP1252_LINES = ("Hello\xa0World", "Second line")
+_LATIN1_BYTES = "Café\n naïve\n".encode("latin-1")
+_LATIN1_LINES = ("Café", " naïve")
+
+
+def _check(
+    result: list[str],
+    *,
+    blocks: int,
+    contains: tuple[str, ...] = (),
+    not_contains: tuple[str, ...] = (),
+) -> None:
+    """Assert the block count and marker presence of diff_lines output in one pass.
+
+    Args:
+        result: Output of diff_lines.
+        blocks: Expected number of "---" block separators.
+        contains: Substrings that must each appear in some output line.
+        not_contains: Substrings that must not appear in any output line.
+    """
+    found_blocks = 0
+    missing = set(contains)
+    unexpected: set[str] = set()
+    for line in result:
+        if line == "---":
+            found_blocks += 1
+            continue
+        if missing:
+            missing = {needle for needle in missing if needle not in line}
+        unexpected.update(needle for needle in not_contains if needle in line)
+
+    assert found_blocks == blocks
+    assert not missing, f"missing from diff output: {sorted(missing)}"
+    assert not unexpected, f"unexpected in diff output: {sorted(unexpected)}"
 
-    @pytest.mark.unit
-    def test_trailing_spaces_collapsed(self) -> None:
-        """Test that trailing spaces are collapsed."""
-        assert normalize_line("Hello World  ") == "Hello World "
 
-    @pytest.mark.unit
-    def test_empty_string_unchanged(self) -> None:
-        """Test that empty strings remain empty."""
-        assert normalize_line("") == ""
+class TestNormalizeLine:
+    """Tests for the normalize_line function."""
 
-    @pytest.mark.unit
-    def test_single_space_unchanged(self) -> None:
-        """Test that a single space remains unchanged."""
-        assert normalize_line("Hello World") == "Hello World"
+    @pytest.mark.parametrize(
+        ("raw", "expected"),
+        [
+            ("Hello   World", "Hello World"),
+            ("Hello\tWorld", "Hello World"),
+            ("Hello  \t \t World", "Hello World"),
+            ("  Hello World", " Hello World"),
+            ("Hello World  ", "Hello World "),
+            ("", ""),
+            ("Hello World", "Hello World"),
+            (" \t  ", " "),
+            ("\u3000Hello\xa0\u2003World\u2028", " Hello World "),
+        ],
+        ids=[
+            "multiple-spaces",
+            "tab",
+            "mixed-whitespace",
+            "leading-spaces",
+            "trailing-spaces",
+            "empty",
+            "single-space",
+            "whitespace-only",
+            "unicode-whitespace",
+        ],
+    )
+    def test_normalize(self, raw: str, expected: str) -> None:
+        """Test that whitespace runs collapse to one space, keeping leading/trailing ones."""
+        assert normalize_line(raw) == expected
+
+    def test_matches_regex_collapse(self) -> None:
+        """Test that normalization matches collapsing \\s+ runs with a regex."""
+        samples = ["", " ", "a", " a", "a ", "\ta\x0bb\x1c c\x85", "\x00 x \u200b y"]
+        for line in samples:
+            assert normalize_line(line) == re.sub(r"\s+", " ", line)
 
 
 class TestLinesEqualNorm:
     """Tests for the lines_equal_norm function."""
 
-    @pytest.mark.unit
-    def test_identical_lines_equal(self) -> None:
-        """Test that identical lines are considered equal."""
-        assert lines_equal_norm("Hello World", "Hello World") is True
-
-    @pytest.mark.unit
-    def test_different_whitespace_quantity_equal(self) -> None:
-        """Test that lines differing only in whitespace quantity are equal."""
-        assert lines_equal_norm("Hello   World", "Hello World") is True
-
-    @pytest.mark.unit
-    def test_tab_vs_space_equal(self) -> None:
-        """Test that tabs and spaces are considered equivalent."""
-        assert lines_equal_norm("Hello\tWorld", "Hello World") is True
-
-    @pytest.mark.unit
-    def test_different_content_not_equal(self) -> None:
-        """Test that lines with different content are not equal."""
-        assert lines_equal_norm("Hello World", "Goodbye World") is False
-
-    @pytest.mark.unit
-    def test_missing_space_not_equal(self) -> None:
-        """Test that missing space between words makes lines unequal."""
-        assert lines_equal_norm("Hello World", "HelloWorld") is False
+    @pytest.mark.parametrize(
+        ("a", "b", "expected"),
+        [
+            ("Hello World", "Hello World", True),
+            ("Hello   World", "Hello World", True),
+            ("Hello\tWorld", "Hello World", True),
+            ("Hello World", "Goodbye World", False),
+            ("Hello World", "HelloWorld", False),
+        ],
+        ids=[
+            "identical",
+            "whitespace-quantity",
+            "tab-vs-space",
+            "different-content",
+            "missing-space",
+        ],
+    )
+    def test_lines_equal_norm(self, a: str, b: str, expected: bool) -> None:
+        """Test equality after normalization: whitespace quantity is ignored, presence is not."""
+        assert lines_equal_norm(a, b) is expected
 
 
 class TestAnnotateChanges:
     """Tests for the annotate_changes function."""
 
-    @pytest.mark.unit
-    def test_identical_lines_no_markers(self) -> None:
-        """Test that identical lines produce no change markers."""
-        result = annotate_changes("Hello World", "Hello World")
-        assert result == "Hello World"
-
-    @pytest.mark.unit
-    def test_single_word_addition(self) -> None:
-        """Test that a single word addition is marked correctly."""
-        result = annotate_changes("Hello World", "Hello Beautiful World")
-        # Whitespace tokens are included, so we get: "Hello" " " "Beautiful" " " "World"
-        assert result == "Hello ++Beautiful++++ ++World"
-
-    @pytest.mark.unit
-    def test_single_word_deletion(self) -> None:
-        """Test that a single word deletion is marked correctly."""
-        result = annotate_changes("Hello Beautiful World", "Hello World")
-        # Whitespace tokens are included
-        assert result == "Hello --Beautiful---- --World"
-
-    @pytest.mark.unit
-    def test_word_replacement(self) -> None:
-        """Test that word replacement shows both deletion and addition."""
-        result = annotate_changes("Hello World", "Hello Universe")
-        assert result == "Hello --World--++Universe++"
-
-    @pytest.mark.unit
-    def test_whitespace_addition(self) -> None:
-        """Test that whitespace addition is marked."""
-        result = annotate_changes("Hello World.How", "Hello World. How")
-        # Tokens: "Hello" " " "World.How" vs "Hello" " " "World." " " "How"
-        assert "--World.How--" in result
-        assert "++World.++" in result
-        assert "++ ++" in result
-        assert "++How++" in result
-
-    @pytest.mark.unit
-    def test_multiple_spaces_vs_single(self) -> None:
-        """Test that different whitespace quantities are marked."""
-        result = annotate_changes("Hello World", "Hello  World")
-        # Should show deletion of single space and addition of double space
-        assert "-- --" in result
-        assert "++  ++" in result
-
-    @pytest.mark.unit
-    def test_complete_line_change(self) -> None:
-        """Test complete line replacement."""
-        result = annotate_changes("Old line", "New line")
-        assert "--Old--" in result
-        assert "++New++" in result
-
-
+    @pytest.mark.parametrize(
+        ("line1", "line2", "expected"),
+        [
+            ("Hello World", "Hello World", "Hello World"),
+            # Whitespace tokens are included: "Hello" " " "Beautiful" " " "World"
+            ("Hello World", "Hello Beautiful World", "Hello ++Beautiful++++ ++World"),
+            ("Hello Beautiful World", "Hello World", "Hello --Beautiful---- --World"),
+            ("Hello World", "Hello Universe", "Hello --World--++Universe++"),
+            # Repeated tokens are matched by position, not just by value
+            ("x = x + 1", "x = x + x + 1", "x = x + ++x++++ +++++++++ ++1"),
+            ("", "new  line", "++new++++  ++++line++"),
+            ("old line", "", "--old---- ----line--"),
+            ("", "", ""),
+        ],
+        ids=[
+            "identical",
+            "word-addition",
+            "word-deletion",
+            "word-replacement",
+            "repeated-tokens",
+            "empty-old-side",
+            "empty-new-side",
+            "both-empty",
+        ],
+    )
+    def test_exact_annotation(self, line1: str, line2: str, expected: str) -> None:
+        """Test the full annotated output for token additions, deletions and replacements."""
+        assert annotate_changes(line1, line2) == expected
+
+    @pytest.mark.parametrize(
+        ("line1", "line2", "markers"),
+        [
+            # Tokens: "Hello" " " "World.How" vs "Hello" " " "World." " " "How"
+            (
+                "Hello World.How",
+                "Hello World. How",
+                ("--World.How--", "++World.++", "++ ++", "++How++"),
+            ),
+            ("Hello World", "Hello  World", ("-- --", "++  ++")),
+            ("Old line", "New line", ("--Old--", "++New++")),
+        ],
+        ids=["whitespace-addition", "whitespace-quantity", "complete-line-change"],
+    )
+    def test_annotation_markers(self, line1: str, line2: str, markers: tuple[str, ...]) -> None:
+        """Test that whitespace and whole-line changes carry the expected markers."""
+        result = annotate_changes(line1, line2)
+        for marker in markers:
+            assert marker in result
+
+    @pytest.mark.parametrize(
+        ("line1", "line2", "expected"),
+        [
+            ("a x b", "c x d", "--a--++c++ x --b--++d++"),
+            ("a x b", "a c x d b", "a ++c++++ ++x++ ++++d++ b"),
+            ("a c x d b", "a x b", "a --c---- --x-- ----d-- b"),
+        ],
+        ids=["replace-around-equal", "insert-around-equal", "delete-around-equal"],
+    )
+    def test_matched_middle(self, line1: str, line2: str, expected: str) -> None:
+        """Test the equal, insert, delete and replace arms on the middle left after trimming."""
+        assert annotate_changes(line1, line2) == expected
+
+    @pytest.mark.parametrize(
+        ("line1", "line2", "expected"),
+        [
+            ("the cat", "the the cat", "the ++the++++ ++cat"),
+            ("x = 1", "x = x = 1", "x = ++x++++ ++++=++++ ++1"),
+        ],
+        ids=["duplicated-word", "duplicated-prefix"],
+    )
+    def test_alignment_after_trimming_common_tokens(
+        self, line1: str, line2: str, expected: str
+    ) -> None:
+        """Test the alignment chosen once identical leading/trailing tokens are trimmed.
+
+        Matching only the tokens between the common prefix and suffix can mark
+        different tokens than matching the whole lines; these cases pin it.
+        """
+        assert annotate_changes(line1, line2) == expected
+
+    def test_change_inside_long_line(self) -> None:
+        """Test that identical leading and trailing tokens are kept around a change."""
+        head = " ".join(f"w{i}" for i in range(200))
+        tail = " ".join(f"v{i}" for i in range(200))
+        result = annotate_changes(f"{head} old {tail}", f"{head} new {tail}")
+        assert result == f"{head} --old--++new++ {tail}"
+
+
+# Kept on one xdist worker so the class shares that worker's session fixtures
+@pytest.mark.xdist_group("diff_lines")
 class TestDiffLines:
     """Tests for the diff_lines function."""
 
-    @pytest.mark.unit
     def test_identical_lines_no_output(self) -> None:
         """Test that identical lines produce no output."""
         lines1 = ["Hello World", "Goodbye"]
@@ -150,7 +237,6 @@ class TestDiffLines:
         result = diff_lines(lines1, lines2)
         assert result == []
 
-    @pytest.mark.unit
     def test_whitespace_only_differences_skipped(self) -> None:
         """Test that whitespace-only differences are skipped."""
         lines1 = ["Hello   World"]
@@ -158,7 +244,6 @@ class TestDiffLines:
         result = diff_lines(lines1, lines2)
         assert result == []
 
-    @pytest.mark.unit
     def test_changed_line_produces_block(self) -> None:
         """Test that a changed line produces the correct output block."""
         lines1 = ["Hello World"]
@@ -172,7 +257,6 @@ class TestDiffLines:
         assert "--World--" in result[4]
         assert "++Universe++" in result[4]
 
-    @pytest.mark.unit
     def test_multiple_changed_lines(self) -> None:
         """Test multiple changed lines produce multiple blocks."""
         lines1 = ["Line 1", "Line 2"]
@@ -180,33 +264,53 @@ class TestDiffLines:
         result = diff_lines(lines1, lines2)
 
         # Should have two blocks separated by blank lines
-        assert result.count("---") == 2
-
-    @pytest.mark.unit
-    def test_insert_only_single_line(self) -> None:
-        """Test that a single inserted line is detected correctly."""
-        lines1 = ["Line 1", "Line 3"]
-        lines2 = ["Line 1", "Line 2", "Line 3"]
+        _check(result, blocks=2)
+
+    @pytest.mark.parametrize(
+        ("lines1", "lines2", "expected_blocks", "expected_markers"),
+        [
+            (["Line 1", "Line 3"], ["Line 1", "Line 2", "Line 3"], 1, ("++Line 2++",)),
+            (["Line 1", "Line 2", "Line 3"], ["Line 1", "Line 3"], 1, ("--Line 2--",)),
+            (
+                ["Line 1", "Line 5"],
+                ["Line 1", "Line 2", "Line 3", "Line 4", "Line 5"],
+                3,
+                ("++Line 2++", "++Line 3++", "++Line 4++"),
+            ),
+            (
+                ["Line 1", "Line 2", "Line 3", "Line 4", "Line 5"],
+                ["Line 1", "Line 5"],
+                3,
+                ("--Line 2--", "--Line 3--", "--Line 4--"),
+            ),
+            (["Line 2", "Line 3"], ["Line 1", "Line 2", "Line 3"], 1, ("++Line 1++",)),
+            (["Line 1", "Line 2"], ["Line 1", "Line 2", "Line 3"], 1, ("++Line 3++",)),
+            (["Line 1", "Line 2", "Line 3"], ["Line 2", "Line 3"], 1, ("--Line 1--",)),
+            (["Line 1", "Line 2", "Line 3"], ["Line 1", "Line 2"], 1, ("--Line 3--",)),
+        ],
+        ids=[
+            "insert-single-line",
+            "delete-single-line",
+            "consecutive-insertions",
+            "consecutive-deletions",
+            "insert-at-beginning",
+            "insert-at-end",
+            "delete-at-beginning",
+            "delete-at-end",
+        ],
+    )
+    def test_insertions_and_deletions(
+        self,
+        lines1: list[str],
+        lines2: list[str],
+        expected_blocks: int,
+        expected_markers: tuple[str, ...],
+    ) -> None:
+        """Test that inserted and deleted lines each get one block with whole-line markers."""
         result = diff_lines(lines1, lines2)
 
-        # Should have one block for the insertion
-        assert result.count("---") == 1
-        # Inserted line should be marked with ++
-        assert any("++Line 2++" in line for line in result)
+        _check(result, blocks=expected_blocks, contains=expected_markers)
 
-    @pytest.mark.unit
-    def test_delete_only_single_line(self) -> None:
-        """Test that a single deleted line is detected correctly."""
-        lines1 = ["Line 1", "Line 2", "Line 3"]
-        lines2 = ["Line 1", "Line 3"]
-        result = diff_lines(lines1, lines2)
-
-        # Should have one block for the deletion
-        assert result.count("---") == 1
-        # Deleted line should be marked with --
-        assert any("--Line 2--" in line for line in result)
-
-    @pytest.mark.unit
     def test_insert_and_delete_different_positions(self) -> None:
         """Test insert and delete at different positions in the file."""
         lines1 = ["Line 1", "Line 2", "Line 4"]
@@ -214,77 +318,8 @@ class TestDiffLines:
         result = diff_lines(lines1, lines2)
 
         # Should have one block showing the replacement
-        assert result.count("---") == 1
-        assert any("Line 2" in line for line in result)
-        assert any("Line 3" in line for line in result)
-
-    @pytest.mark.unit
-    def test_multiple_consecutive_insertions(self) -> None:
-        """Test multiple consecutive line insertions."""
-        lines1 = ["Line 1", "Line 5"]
-        lines2 = ["Line 1", "Line 2", "Line 3", "Line 4", "Line 5"]
-        result = diff_lines(lines1, lines2)
-
-        # Should have three blocks for the three insertions
-        assert result.count("---") == 3
-        assert any("++Line 2++" in line for line in result)
-        assert any("++Line 3++" in line for line in result)
-        assert any("++Line 4++" in line for line in result)
-
-    @pytest.mark.unit
-    def test_multiple_consecutive_deletions(self) -> None:
-        """Test multiple consecutive line deletions."""
-        lines1 = ["Line 1", "Line 2", "Line 3", "Line 4", "Line 5"]
-        lines2 = ["Line 1", "Line 5"]
-        result = diff_lines(lines1, lines2)
+        _check(result, blocks=1, contains=("Line 2", "Line 3"))
 
-        # Should have three blocks for the three deletions
-        assert result.count("---") == 3
-        assert any("--Line 2--" in line for line in result)
-        assert any("--Line 3--" in line for line in result)
-        assert any("--Line 4--" in line for line in result)
-
-    @pytest.mark.unit
-    def test_insert_at_beginning(self) -> None:
-        """Test line insertion at the beginning of file."""
-        lines1 = ["Line 2", "Line 3"]
-        lines2 = ["Line 1", "Line 2", "Line 3"]
-        result = diff_lines(lines1, lines2)
-
-        assert result.count("---") == 1
-        assert any("++Line 1++" in line for line in result)
-
-    @pytest.mark.unit
-    def test_insert_at_end(self) -> None:
-        """Test line insertion at the end of file."""
-        lines1 = ["Line 1", "Line 2"]
-        lines2 = ["Line 1", "Line 2", "Line 3"]
-        result = diff_lines(lines1, lines2)
-
-        assert result.count("---") == 1
-        assert any("++Line 3++" in line for line in result)
-
-    @pytest.mark.unit
-    def test_delete_at_beginning(self) -> None:
-        """Test line deletion at the beginning of file."""
-        lines1 = ["Line 1", "Line 2", "Line 3"]
-        lines2 = ["Line 2", "Line 3"]
-        result = diff_lines(lines1, lines2)
-
-        assert result.count("---") == 1
-        assert any("--Line 1--" in line for line in result)
-
-    @pytest.mark.unit
-    def test_delete_at_end(self) -> None:
-        """Test line deletion at the end of file."""
-        lines1 = ["Line 1", "Line 2", "Line 3"]
-        lines2 = ["Line 1", "Line 2"]
-        result = diff_lines(lines1, lines2)
-
-        assert result.count("---") == 1
-        assert any("--Line 3--" in line for line in result)
-
-    @pytest.mark.unit
     def test_no_cascading_false_positives(self) -> None:
         """Test that inserting a line doesn't flag subsequent lines as different."""
         lines1 = ["Line 1", "Line 3", "Line 4", "Line 5"]
@@ -292,14 +327,10 @@ class TestDiffLines:
         result = diff_lines(lines1, lines2)
 
         # Should only have one block for the insertion
-        assert result.count("---") == 1
-        assert any("++Line 2++" in line for line in result)
         # Lines 3, 4, 5 should NOT appear in the diff
+        _check(result, blocks=1, contains=("++Line 2++",), not_contains=("Line 4", "Line 5"))
         assert result.count("Line 3") <= 1  # Only in the insertion context if at all
-        assert "Line 4" not in "\n".join(result) or result.count("Line 4") == 0
-        assert "Line 5" not in "\n".join(result) or result.count("Line 5") == 0
 
-    @pytest.mark.unit
     def test_replace_with_token_level_annotation(self) -> None:
         """Test that line replacements use token-level annotation."""
         lines1 = ["Hello World"]
@@ -307,10 +338,8 @@ class TestDiffLines:
         result = diff_lines(lines1, lines2)
 
         # Should show token-level changes
-        assert "--World--" in "\n".join(result)
-        assert "++Universe++" in "\n".join(result)
+        _check(result, blocks=1, contains=("--World--", "++Universe++"))
 
-    @pytest.mark.unit
     def test_different_length_files(self) -> None:
         """Test files with different lengths."""
         lines1 = ["Line 1"]
@@ -318,27 +347,116 @@ class TestDiffLines:
         result = diff_lines(lines1, lines2)
 
         # Second line is an insertion
-        assert "---" in result
-        assert any("++Line 2++" in line for line in result)
+        _check(result, blocks=1, contains=("++Line 2++",))
+
+    def test_small_file_insertion(self) -> None:
+        """Test that one insertion in a 50-line file is reported alone (traced-run variant)."""
+        lines1 = [f"Line {i}" for i in range(50)]
+        lines2 = [*lines1[:25], "Inserted Line", *lines1[25:]]
+        result = diff_lines(lines1, lines2)
+
+        _check(result, blocks=1, contains=("++Inserted Line++",), not_contains=("Line 25",))
 
-    @pytest.mark.unit
-    def test_large_file_performance(self) -> None:
+    @pytest.mark.skipif(_UNDER_COVERAGE, reason="skip 1000-line perf under tracing")
+    @pytest.mark.benchmark(group="diff_lines_1000")
+    def test_large_file_performance(
+        self,
+        benchmark: BenchmarkFixture,
+        large_line_pair: tuple[tuple[str, ...], tuple[str, ...]],
+    ) -> None:
         """Test performance with large files (regression test)."""
-        # Create synthetic 1000-line files with one insertion
-        lines1 = [f"Line {i}" for i in range(1000)]
-        lines2 = (
-            [f"Line {i}" for i in range(500)]
-            + ["Inserted Line"]
-            + [f"Line {i}" for i in range(500, 1000)]
-        )
+        # Synthetic 1000-line files with one insertion
+        lines1, lines2 = large_line_pair
 
-        result = diff_lines(lines1, lines2)
+        result = benchmark(diff_lines, list(lines1), list(lines2))
 
         # Should only report the one insertion, not flag remaining 500 lines
-        assert result.count("---") == 1
-        assert any("++Inserted Line++" in line for line in result)
+        _check(result, blocks=1, contains=("++Inserted Line++",))
+
+    def test_change_between_common_prefix_and_suffix(self) -> None:
+        """Test that changes inside identical leading/trailing lines map to the right lines."""
+        lines1 = ["Head", "Same", "Old 1", "Old 2", "Tail", "End"]
+        lines2 = ["Head", "Same", "New 1", "Tail", "End"]
+        result = diff_lines(lines1, lines2)
+
+        assert result == [
+            "---",
+            "File A: Old 1",
+            "File B: New 1",
+            "",
+            "--Old--++New++ 1",
+            "",
+            "---",
+            "File A: Old 2",
+            "File B: ",
+            "",
+            "--Old 2--",
+            "",
+        ]
+
+    @pytest.mark.parametrize(
+        ("lines1", "lines2", "expected"),
+        [
+            # The shared trailing "}" is trimmed first, so the remaining lines pair
+            # up as one replacement instead of an insertion plus a deletion
+            (
+                ["}", "}"],
+                ["return x", "}"],
+                [
+                    "---",
+                    "File A: }",
+                    "File B: return x",
+                    "",
+                    "--}--++return++++ ++++x++",
+                    "",
+                ],
+            ),
+            # The shared leading "start" is trimmed first, so the second "start" is
+            # no longer matched and the result has three blocks rather than two
+            (
+                ["start", "start", "end", "end"],
+                ["start", "end", "start"],
+                [
+                    "---",
+                    "File A: ",
+                    "File B: end",
+                    "",
+                    "++end++",
+                    "",
+                    "---",
+                    "File A: end",
+                    "File B: ",
+                    "",
+                    "--end--",
+                    "",
+                    "---",
+                    "File A: end",
+                    "File B: ",
+                    "",
+                    "--end--",
+                    "",
+                ],
+            ),
+        ],
+        ids=["trailing-line-trimmed", "leading-line-trimmed"],
+    )
+    def test_alignment_after_trimming_common_lines(
+        self, lines1: list[str], lines2: list[str], expected: list[str]
+    ) -> None:
+        """Test the alignment chosen once identical leading/trailing lines are trimmed.
+
+        Matching only the lines between the common prefix and suffix can pick a
+        different alignment than matching the whole files; these cases pin it.
+        """
+        assert diff_lines(lines1, lines2) == expected
+
+    def test_whitespace_only_change_between_identical_lines(self) -> None:
+        """Test that normalization still applies to lines between identical ones."""
+        lines1 = ["Head", "a  b", "c", "Tail"]
+        lines2 = ["Head", "a b", "c", "Tail"]
+
+        assert diff_lines(lines1, lines2) == []
 
-    @pytest.mark.unit
     def test_empty_file_comparison(self) -> None:
         """Test comparing empty files."""
         lines1: list[str] = []
@@ -346,7 +464,6 @@ class TestDiffLines:
         result = diff_lines(lines1, lines2)
         assert result == []
 
-    @pytest.mark.unit
     def test_empty_vs_non_empty(self) -> None:
         """Test comparing empty file with non-empty file."""
         lines1: list[str] = []
@@ -354,11 +471,8 @@ class TestDiffLines:
         result = diff_lines(lines1, lines2)
 
         # Both lines should be marked as insertions
-        assert result.count("---") == 2
-        assert any("++Line 1++" in line for line in result)
-        assert any("++Line 2++" in line for line in result)
+        _check(result, blocks=2, contains=("++Line 1++", "++Line 2++"))
 
-    @pytest.mark.unit
     def test_non_empty_vs_empty(self) -> None:
         """Test comparing non-empty file with empty file."""
         lines1 = ["Line 1", "Line 2"]
@@ -366,11 +480,8 @@ class TestDiffLines:
         result = diff_lines(lines1, lines2)
 
         # Both lines should be marked as deletions
-        assert result.count("---") == 2
-        assert any("--Line 1--" in line for line in result)
-        assert any("--Line 2--" in line for line in result)
+        _check(result, blocks=2, contains=("--Line 1--", "--Line 2--"))
 
-    @pytest.mark.unit
     def test_replace_unequal_more_deletions(self) -> None:
         """Test replace operation where source has more lines than destination."""
         lines1 = ["Old Line 1", "Old Line 2", "Old Line 3"]
@@ -378,12 +489,8 @@ class TestDiffLines:
         result = diff_lines(lines1, lines2)
 
         # Should have blocks for the replacement and deletions
-        assert result.count("---") == 3
-        assert any("New Line 1" in line for line in result)
-        assert any("--Old Line 2--" in line for line in result)
-        assert any("--Old Line 3--" in line for line in result)
+        _check(result, blocks=3, contains=("New Line 1", "--Old Line 2--", "--Old Line 3--"))
 
-    @pytest.mark.unit
     def test_replace_unequal_more_insertions(self) -> None:
         """Test replace operation where destination has more lines than source."""
         lines1 = ["Old Line 1"]
@@ -391,76 +498,164 @@ class TestDiffLines:
         result = diff_lines(lines1, lines2)
 
         # Should have blocks for the replacement and insertions
-        assert result.count("---") == 3
-        assert any("Old Line 1" in line for line in result)
-        assert any("++New Line 2++" in line for line in result)
-        assert any("++New Line 3++" in line for line in result)
+        _check(result, blocks=3, contains=("Old Line 1", "++New Line 2++", "++New Line 3++"))
+
+
+class TestIterDiffLines:
+    """Tests for the iter_diff_lines generator."""
+
+    def test_yields_lazily(self) -> None:
+        """Test that iter_diff_lines returns an iterator rather than a list."""
+        result = iter_diff_lines(["Hello World"], ["Hello Universe"])
+        assert not isinstance(result, list)
+        assert next(result) == "---"
+
+    def test_matches_diff_lines(self) -> None:
+        """Test that the generator produces the same lines as diff_lines."""
+        lines1 = ["Line 1", "Line 2", "Line 4", "Old"]
+        lines2 = ["Line 0", "Line 1", "Line 3", "Line 4"]
+        assert list(iter_diff_lines(lines1, lines2)) == diff_lines(lines1, lines2)
+
+    def test_annotates_each_distinct_pair_once(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that a replaced pair repeated within one diff is annotated once."""
+        calls: list[tuple[str, str]] = []
+
+        def counting_annotate(line1: str, line2: str) -> str:
+            calls.append((line1, line2))
+            return annotate_changes(line1, line2)
+
+        monkeypatch.setattr(diff, "annotate_changes", counting_annotate)
+
+        lines1 = ["x = 1", "keep", "x = 1", "other", "x = 1"]
+        lines2 = ["x = 2", "keep", "x = 2", "other", "x = 2"]
+        result = list(iter_diff_lines(lines1, lines2))
+
+        assert calls == [("x = 1", "x = 2")]
+        assert result.count("x = --1--++2++") == 3
+
+    def test_annotation_memo_is_bounded(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that the pair memo is cleared once full, re-annotating evicted pairs."""
+        calls: list[tuple[str, str]] = []
+
+        def counting_annotate(line1: str, line2: str) -> str:
+            calls.append((line1, line2))
+            return annotate_changes(line1, line2)
+
+        monkeypatch.setattr(diff, "annotate_changes", counting_annotate)
+        monkeypatch.setattr(diff, "_ANNOTATION_MEMO_SIZE", 2)
+
+        lines1 = ["a = 1", "k", "b = 1", "k", "c = 1", "k", "a = 1"]
+        lines2 = ["a = 2", "k", "b = 2", "k", "c = 2", "k", "a = 2"]
+        result = list(iter_diff_lines(lines1, lines2))
+
+        # Storing the third pair clears the memo, so the first is annotated again
+        pairs = list(zip(lines1, lines2, strict=True))[::2]
+        assert calls == [*pairs[:3], pairs[0]]
+        assert result.count("a = --1--++2++") == 2
+
+    def test_normalizes_each_distinct_line_once(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that lines repeated within and across the files are normalized once."""
+        calls: list[str] = []
+
+        def counting_normalize(line: str) -> str:
+            calls.append(line)
+            return normalize_line(line)
+
+        monkeypatch.setattr(diff, "normalize_line", counting_normalize)
+
+        lines1 = ["start", "}", "a  b", "}", "end"]
+        lines2 = ["begin", "}", "a b", "}", "finish"]
+        result = list(iter_diff_lines(lines1, lines2))
+
+        assert sorted(calls) == sorted(["start", "}", "a  b", "end", "begin", "a b", "finish"])
+        assert result == diff_lines(lines1, lines2)
 
 
 class TestReadLines:
     """Tests for the read_lines function."""
 
-    @pytest.mark.unit
+    @pytest.mark.serial
     def test_reads_file_content(self, tmp_path: Path) -> None:
-        """Test that read_lines correctly reads file content."""
+        """Test that read_lines correctly reads file content from a real file."""
         test_file = tmp_path / "test.txt"
         test_file.write_text("Line 1\nLine 2\nLine 3\n", encoding="utf-8")
 
         lines = read_lines(test_file)
         assert lines == ["Line 1", "Line 2", "Line 3"]
 
-    @pytest.mark.unit
-    def test_removes_trailing_newlines(self, tmp_path: Path) -> None:
-        """Test that trailing newlines are removed from each line."""
-        test_file = tmp_path / "test.txt"
-        test_file.write_text("Hello\nWorld\n", encoding="utf-8")
+    @pytest.mark.serial
+    def test_reads_other_path_like_objects(self, tmp_path: Path) -> None:
+        """Test that any os.PathLike is read, not only Path (here an os.DirEntry)."""
+        (tmp_path / "test.txt").write_bytes(b"Line 1\nLine 2\n")
 
-        lines = read_lines(test_file)
+        with os.scandir(tmp_path) as entries:
+            (entry,) = entries
+            lines = read_lines(entry)  # type: ignore[arg-type]
+        assert lines == ["Line 1", "Line 2"]
+
+    def test_removes_trailing_newlines(self) -> None:
+        """Test that trailing newlines are removed from each line."""
+        lines = read_lines(io.StringIO("Hello\nWorld\n"))
         assert lines == ["Hello", "World"]
 
-    @pytest.mark.unit
-    def test_empty_file(self, tmp_path: Path) -> None:
+    def test_empty_file(self) -> None:
         """Test reading an empty file."""
-        test_file = tmp_path / "empty.txt"
-        test_file.write_text("", encoding="utf-8")
-
-        lines = read_lines(test_file)
+        lines = read_lines(io.StringIO(""))
         assert lines == []
 
-    @pytest.mark.unit
-    def test_file_not_found(self, tmp_path: Path) -> None:
+    @pytest.mark.serial
+    def test_file_not_found(self, fs: FakeFilesystem) -> None:
         """Test that FileNotFoundError is raised for non-existent files."""
-        non_existent = tmp_path / "does_not_exist.txt"
+        non_existent = Path("/does_not_exist.txt")
 
         with pytest.raises(FileNotFoundError):
             read_lines(non_existent)
 
-    @pytest.mark.unit
-    def test_encoding_fallback_cp1252(self, tmp_path: Path) -> None:
+    def test_blank_lines_and_missing_final_newline(self) -> None:
+        """Test that blank lines are kept and a final unterminated line is read."""
+        lines = read_lines(io.StringIO("First\n\nLast"))
+        assert lines == ["First", "", "Last"]
+
+    @pytest.mark.serial
+    def test_only_newlines_split_lines(self, fs: FakeFilesystem) -> None:
+        """Test that CRLF endings are handled and form feeds stay part of the line."""
+        test_file = Path("/test.txt")
+        test_file.write_bytes(b"Page 1\r\n\x0cPage 2\r\n")
+
+        lines = read_lines(test_file)
+        assert lines == ["Page 1", "\x0cPage 2"]
+
+    @pytest.mark.serial
+    def test_carriage_return_line_endings(self, fs: FakeFilesystem) -> None:
+        """Test that bare CR line endings split lines like a text-mode read."""
+        test_file = Path("/test.txt")
+        test_file.write_bytes(b"Line 1\rLine 2\r\nLine 3")
+
+        lines = read_lines(test_file)
+        assert lines == ["Line 1", "Line 2", "Line 3"]
+
+    @pytest.mark.serial
+    def test_encoding_fallback_cp1252(self, fs: FakeFilesystem) -> None:
         """Test that files with cp1252 encoding are read correctly."""
-        test_file = tmp_path / "cp1252.txt"
-        # Write content with cp1252 encoding (non-breaking space 0xa0)
-        content = "Hello\xa0World\nSecond line\n"
-        test_file.write_bytes(content.encode("cp1252"))
+        test_file = Path("/cp1252.txt")
+        test_file.write_bytes(_CP1252_BYTES)
 
         lines = read_lines(test_file)
-        assert lines == ["Hello\xa0World", "Second line"]
+        assert tuple(lines) == _CP1252_LINES
 
-    @pytest.mark.unit
-    def test_encoding_fallback_latin1(self, tmp_path: Path) -> None:
+    @pytest.mark.serial
+    def test_encoding_fallback_latin1(self, fs: FakeFilesystem) -> None:
         """Test that files with latin-1 encoding are read correctly."""
-        test_file = tmp_path / "latin1.txt"
-        # Write content with latin-1 encoding
-        content = "Café\n naïve\n"
-        test_file.write_bytes(content.encode("latin-1"))
+        test_file = Path("/latin1.txt")
+        test_file.write_bytes(_LATIN1_BYTES)
 
         lines = read_lines(test_file)
-        assert lines == ["Café", " naïve"]
+        assert tuple(lines) == _LATIN1_LINES
 
-    @pytest.mark.unit
-    def test_invalid_characters_skipped(self, tmp_path: Path) -> None:
+    @pytest.mark.serial
+    def test_invalid_characters_skipped(self, fs: FakeFilesystem) -> None:
         """Test that files with invalid characters are read with those characters skipped."""
-        test_file = tmp_path / "invalid.txt"
+        test_file = Path("/invalid.txt")
         # Create a file with invalid UTF-8 sequences that are also invalid in cp1252 and latin-1
         # Using a mix of valid and invalid bytes to test the fallback to errors='ignore'
         # Start with valid UTF-8, then insert invalid sequences
@@ -479,29 +674,36 @@ class TestReadLines:
         assert "2" in lines[1]
 
 
+@pytest.fixture(scope="class")
+def file_pair(tmp_path_factory: pytest.TempPathFactory) -> tuple[Path, Path]:
+    """Return two file paths in one directory shared by every test in the class.
+
+    Tests overwrite both files with their own content before diffing.
+    """
+    directory = tmp_path_factory.mktemp("diff")
+    return directory / "file1.txt", directory / "file2.txt"
+
+
+def _write_pair(file_pair: tuple[Path, Path], content1: bytes, content2: bytes) -> None:
+    """Write raw bytes to both files of a pair, skipping text-mode encoding."""
+    file1, file2 = file_pair
+    file1.write_bytes(content1)
+    file2.write_bytes(content2)
+
+
 class TestDiffFiles:
     """Tests for the diff_files function."""
 
-    @pytest.mark.unit
-    def test_identical_files_empty_output(self, tmp_path: Path) -> None:
+    def test_identical_files_empty_output(self) -> None:
         """Test that identical files produce empty output."""
-        file1 = tmp_path / "file1.txt"
-        file2 = tmp_path / "file2.txt"
-
-        file1.write_text("Hello World\n", encoding="utf-8")
-        file2.write_text("Hello World\n", encoding="utf-8")
-
-        result = diff_files(file1, file2)
+        result = diff_files(io.StringIO("Hello World\n"), io.StringIO("Hello World\n"))
         assert result == ""
 
-    @pytest.mark.unit
-    def test_different_files_produces_diff(self, tmp_path: Path) -> None:
+    @pytest.mark.serial
+    def test_different_files_produces_diff(self, file_pair: tuple[Path, Path]) -> None:
         """Test that different files produce diff output."""
-        file1 = tmp_path / "file1.txt"
-        file2 = tmp_path / "file2.txt"
-
-        file1.write_text("Hello World\n", encoding="utf-8")
-        file2.write_text("Hello Universe\n", encoding="utf-8")
+        file1, file2 = file_pair
+        _write_pair(file_pair, b"Hello World\n", b"Hello Universe\n")
 
         result = diff_files(file1, file2)
         assert "---" in result
@@ -510,29 +712,62 @@ class TestDiffFiles:
         assert "--World--" in result
         assert "++Universe++" in result
 
-    @pytest.mark.unit
-    def test_whitespace_differences_example(self, tmp_path: Path) -> None:
+    def test_whitespace_differences_example(self) -> None:
         """Test the specific whitespace example from the plan."""
-        file1 = tmp_path / "file1.txt"
-        file2 = tmp_path / "file2.txt"
-
-        file1.write_text("Hello World.How are you\n", encoding="utf-8")
-        file2.write_text("Hello World. How are you\n", encoding="utf-8")
-
-        result = diff_files(file1, file2)
+        result = diff_files(
+            io.StringIO("Hello World.How are you\n"), io.StringIO("Hello World. How are you\n")
+        )
         assert "---" in result
         assert "--World.How--" in result
         assert "++World.++" in result
         assert "++ ++" in result
         assert "++How++" in result
 
-    @pytest.mark.unit
-    def test_file_not_found_raises_error(self, tmp_path: Path) -> None:
+    @pytest.mark.serial
+    def test_first_missing_file_reported_first(self, fs: FakeFilesystem) -> None:
+        """Test that the first file's error wins when both files are missing."""
+        file1 = Path("/missing1.txt")
+        file2 = Path("/missing2.txt")
+
+        with pytest.raises(FileNotFoundError) as exc_info:
+            diff_files(file1, file2)
+
+        assert exc_info.value.filename == str(file1)
+
+    @pytest.mark.serial
+    def test_file_not_found_raises_error(self, fs: FakeFilesystem) -> None:
         """Test that FileNotFoundError is raised for non-existent files."""
-        file1 = tmp_path / "exists.txt"
-        file2 = tmp_path / "does_not_exist.txt"
+        file1 = Path("/exists.txt")
+        file2 = Path("/does_not_exist.txt")
 
-        file1.write_text("content\n", encoding="utf-8")
+        # An empty first file is enough; the error must come from the second path
+        file1.touch()
 
-        with pytest.raises(FileNotFoundError):
+        with pytest.raises(FileNotFoundError) as exc_info:
             diff_files(file1, file2)
+        assert exc_info.value.filename == str(file2)
+
+
+@pytest.mark.serial
+class TestDiffFilesStream:
+    """Tests for the diff_files_stream function."""
+
+    def test_matches_diff_files(self, file_pair: tuple[Path, Path]) -> None:
+        """Test that the streamed output is identical to diff_files."""
+        file1, file2 = file_pair
+        _write_pair(
+            file_pair, b"Line 1\nLine 2\nLine 3\n", b"Line One\nLine 2\nLine Three\nLine 4\n"
+        )
+
+        out = io.StringIO()
+        diff_files_stream(file1, file2, out)
+        assert out.getvalue() == diff_files(file1, file2)
+
+    def test_identical_files_write_nothing(self, file_pair: tuple[Path, Path]) -> None:
+        """Test that identical files leave the stream empty."""
+        file1, file2 = file_pair
+        _write_pair(file_pair, b"Same content\n", b"Same content\n")
+
+        out = io.StringIO()
+        diff_files_stream(file1, file2, out)
+        assert out.getvalue() == ""
@@ -0,0 +1,42 @@
+"""Unit tests for the diff_utility package's lazy re-exports."""
+
+from __future__ import annotations
+
+import pytest
+
+import diff_utility
+from diff_utility import diff
+
+pytestmark = pytest.mark.unit
+
+_LAZY_NAMES = [name for name in diff_utility.__all__ if name != "__version__"]
+
+
+@pytest.fixture
+def unloaded(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Drop re-exports cached by earlier accesses so they resolve lazily again."""
+    for name in _LAZY_NAMES:
+        monkeypatch.delitem(vars(diff_utility), name, raising=False)
+
+
+class TestLazyExports:
+    """Tests for the package-level __getattr__ and __dir__."""
+
+    @pytest.mark.parametrize("name", _LAZY_NAMES)
+    def test_from_import_resolves_to_diff_module(self, name: str, unloaded: None) -> None:
+        """Test that each name in __all__ imports from the package as the diff function."""
+        namespace: dict[str, object] = {}
+        exec(f"from diff_utility import {name}", namespace)
+
+        assert namespace[name] is getattr(diff, name)
+        # Cached on the package after the first access
+        assert vars(diff_utility)[name] is getattr(diff, name)
+
+    def test_unknown_name_raises_attribute_error(self) -> None:
+        """Test that names outside __all__ raise AttributeError."""
+        with pytest.raises(AttributeError, match="has no attribute 'no_such_name'"):
+            getattr(diff_utility, "no_such_name")  # noqa: B009
+
+    def test_dir_lists_lazy_exports(self, unloaded: None) -> None:
+        """Test that dir() lists the re-exports before they are first accessed."""
+        assert set(diff_utility.__all__) <= set(dir(diff_utility))
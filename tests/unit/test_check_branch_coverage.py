@@ -4,18 +4,35 @@ Unit tests for scripts/check_branch_coverage.py.
 Tests coverage enforcement logic with various coverage.json payloads.
 """
 
+import importlib.util
 import json
-import sys
 from pathlib import Path
+from typing import Protocol
 
 import pytest
 
-# Import from scripts directory
-scripts_dir = Path(__file__).parent.parent.parent / "scripts"
-if str(scripts_dir) not in sys.path:
-    sys.path.insert(0, str(scripts_dir))
+_SCRIPT = Path(__file__).parent.parent.parent / "scripts" / "check_branch_coverage.py"
 
-from check_branch_coverage import check_branch_coverage  # noqa: E402
+# Coverage report with 100 branches; format in the number of covered branches
+_TMPL = b'{"totals":{"num_branches":100,"covered_branches":%d}}'
+
+
+class _CheckBranchCoverage(Protocol):
+    """Call signature of the script's check_branch_coverage function."""
+
+    def __call__(self, coverage_file: Path | bytes, threshold: float) -> int: ...
+
+
+@pytest.fixture(scope="session")
+def check_branch_coverage() -> _CheckBranchCoverage:
+    """Load scripts/check_branch_coverage.py once per session and return its check function."""
+    spec = importlib.util.spec_from_file_location("check_branch_coverage", _SCRIPT)
+    assert spec is not None
+    assert spec.loader is not None
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    check: _CheckBranchCoverage = module.check_branch_coverage
+    return check
 
 
 @pytest.fixture
@@ -24,52 +41,37 @@ def temp_coverage_file(tmp_path: Path) -> Path:
     return tmp_path / "coverage.json"
 
 
-def test_passing_branch_coverage(temp_coverage_file: Path) -> None:
+@pytest.mark.serial
+def test_passing_branch_coverage(
+    temp_coverage_file: Path, check_branch_coverage: _CheckBranchCoverage
+) -> None:
     """Test that coverage above threshold passes."""
-    coverage_data = {
-        "totals": {
-            "num_branches": 100,
-            "covered_branches": 80,
-        }
-    }
-    temp_coverage_file.write_text(json.dumps(coverage_data))
+    temp_coverage_file.write_bytes(_TMPL % 80)
 
     result = check_branch_coverage(temp_coverage_file, threshold=75.0)
 
     assert result == 0
 
 
-def test_failing_branch_coverage(temp_coverage_file: Path) -> None:
+def test_failing_branch_coverage(check_branch_coverage: _CheckBranchCoverage) -> None:
     """Test that coverage below threshold fails."""
-    coverage_data = {
-        "totals": {
-            "num_branches": 100,
-            "covered_branches": 70,
-        }
-    }
-    temp_coverage_file.write_text(json.dumps(coverage_data))
+    report = _TMPL % 70
 
-    result = check_branch_coverage(temp_coverage_file, threshold=75.0)
+    result = check_branch_coverage(report, threshold=75.0)
 
     assert result == 1
 
 
-def test_exact_threshold_passes(temp_coverage_file: Path) -> None:
+def test_exact_threshold_passes(check_branch_coverage: _CheckBranchCoverage) -> None:
     """Test that coverage exactly at threshold passes."""
-    coverage_data = {
-        "totals": {
-            "num_branches": 100,
-            "covered_branches": 75,
-        }
-    }
-    temp_coverage_file.write_text(json.dumps(coverage_data))
+    report = _TMPL % 75
 
-    result = check_branch_coverage(temp_coverage_file, threshold=75.0)
+    result = check_branch_coverage(report, threshold=75.0)
 
     assert result == 0
 
 
-def test_zero_branches_passes(temp_coverage_file: Path) -> None:
+def test_zero_branches_passes(check_branch_coverage: _CheckBranchCoverage) -> None:
     """Test that files with no branches pass (100% by default)."""
     coverage_data = {
         "totals": {
@@ -77,14 +79,15 @@ def test_zero_branches_passes(temp_coverage_file: Path) -> None:
             "covered_branches": 0,
         }
     }
-    temp_coverage_file.write_text(json.dumps(coverage_data))
+    report = json.dumps(coverage_data).encode()
 
-    result = check_branch_coverage(temp_coverage_file, threshold=75.0)
+    result = check_branch_coverage(report, threshold=75.0)
 
     assert result == 0
 
 
-def test_missing_coverage_file(tmp_path: Path) -> None:
+@pytest.mark.serial
+def test_missing_coverage_file(tmp_path: Path, check_branch_coverage: _CheckBranchCoverage) -> None:
     """Test that missing coverage file returns error."""
     nonexistent_file = tmp_path / "does_not_exist.json"
 
@@ -93,27 +96,27 @@ def test_missing_coverage_file(tmp_path: Path) -> None:
     assert result == 1
 
 
-def test_malformed_json(temp_coverage_file: Path) -> None:
+def test_malformed_json(check_branch_coverage: _CheckBranchCoverage) -> None:
     """Test that malformed JSON returns error."""
-    temp_coverage_file.write_text("{invalid json")
+    report = b"{invalid json"
 
-    result = check_branch_coverage(temp_coverage_file, threshold=75.0)
+    result = check_branch_coverage(report, threshold=75.0)
 
     assert result == 1
 
 
-def test_missing_totals_key(temp_coverage_file: Path) -> None:
+def test_missing_totals_key(check_branch_coverage: _CheckBranchCoverage) -> None:
     """Test that missing totals key uses defaults (no branches = pass)."""
     coverage_data: dict[str, dict[str, object]] = {"files": {}}
-    temp_coverage_file.write_text(json.dumps(coverage_data))
+    report = json.dumps(coverage_data).encode()
 
-    result = check_branch_coverage(temp_coverage_file, threshold=75.0)
+    result = check_branch_coverage(report, threshold=75.0)
 
     # Should pass with 0 branches (100% coverage)
     assert result == 0
 
 
-def test_missing_branch_keys(temp_coverage_file: Path) -> None:
+def test_missing_branch_keys(check_branch_coverage: _CheckBranchCoverage) -> None:
     """Test that missing branch keys default to 0 (no branches = pass)."""
     coverage_data = {
         "totals": {
@@ -121,15 +124,15 @@ def test_missing_branch_keys(temp_coverage_file: Path) -> None:
             "covered_lines": 85,
         }
     }
-    temp_coverage_file.write_text(json.dumps(coverage_data))
+    report = json.dumps(coverage_data).encode()
 
-    result = check_branch_coverage(temp_coverage_file, threshold=75.0)
+    result = check_branch_coverage(report, threshold=75.0)
 
     # Should pass with 0 branches (100% coverage)
     assert result == 0
 
 
-def test_fractional_coverage(temp_coverage_file: Path) -> None:
+def test_fractional_coverage(check_branch_coverage: _CheckBranchCoverage) -> None:
     """Test coverage calculation with fractional percentages."""
     coverage_data = {
         "totals": {
@@ -137,28 +140,22 @@ def test_fractional_coverage(temp_coverage_file: Path) -> None:
             "covered_branches": 2,
         }
     }
-    temp_coverage_file.write_text(json.dumps(coverage_data))
+    report = json.dumps(coverage_data).encode()
 
     # 2/3 = 66.67%, should fail against 75% threshold
-    result = check_branch_coverage(temp_coverage_file, threshold=75.0)
+    result = check_branch_coverage(report, threshold=75.0)
 
     assert result == 1
 
 
-def test_custom_threshold(temp_coverage_file: Path) -> None:
+def test_custom_threshold(check_branch_coverage: _CheckBranchCoverage) -> None:
     """Test that custom threshold values are respected."""
-    coverage_data = {
-        "totals": {
-            "num_branches": 100,
-            "covered_branches": 85,
-        }
-    }
-    temp_coverage_file.write_text(json.dumps(coverage_data))
+    report = _TMPL % 85
 
     # Should pass 80% threshold
-    result_pass = check_branch_coverage(temp_coverage_file, threshold=80.0)
+    result_pass = check_branch_coverage(report, threshold=80.0)
     assert result_pass == 0
 
     # Should fail 90% threshold
-    result_fail = check_branch_coverage(temp_coverage_file, threshold=90.0)
+    result_fail = check_branch_coverage(report, threshold=90.0)
     assert result_fail == 1